@@ -0,0 +1,232 @@
+"""Schema iniziale (tabelle create finora da create_all e dagli script migrate_*.py)
+
+Sui database creati prima di Alembic le tabelle esistono già e la revisione
+non fa nulla: le revisioni successive portano lo schema allo stato attuale.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'users' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table('checklist_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('room_name', sa.String(), nullable=True),
+    sa.Column('is_mandatory', sa.Boolean(), nullable=True),
+    sa.Column('order', sa.Integer(), nullable=True),
+    sa.Column('item_type', sa.String(), nullable=False),
+    sa.Column('expected_number', sa.Integer(), nullable=True),
+    sa.Column('amazon_link', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('checklist_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_checklist_items_id'), ['id'], unique=False)
+
+    op.create_table('properties',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('address', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('properties', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_properties_id'), ['id'], unique=False)
+
+    op.create_table('supplies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('total_quantity', sa.Integer(), nullable=True),
+    sa.Column('unit', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('room', sa.String(), nullable=True),
+    sa.Column('amazon_link', sa.String(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('supplies', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_supplies_id'), ['id'], unique=False)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+
+    op.create_table('apartments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('floor', sa.String(), nullable=True),
+    sa.Column('number', sa.String(), nullable=True),
+    sa.Column('beds', sa.Integer(), nullable=True),
+    sa.Column('bathrooms', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('apartments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_apartments_id'), ['id'], unique=False)
+
+    op.create_table('supply_alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('supply_id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('reported_by', sa.Integer(), nullable=True),
+    sa.Column('is_resolved', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['reported_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['supply_id'], ['supplies.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('supply_alerts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_supply_alerts_id'), ['id'], unique=False)
+
+    op.create_table('apartment_checklist_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('apartment_id', sa.Integer(), nullable=False),
+    sa.Column('checklist_item_id', sa.Integer(), nullable=False),
+    sa.Column('order', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['apartment_id'], ['apartments.id'], ),
+    sa.ForeignKeyConstraint(['checklist_item_id'], ['checklist_items.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('apartment_checklist_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_apartment_checklist_items_id'), ['id'], unique=False)
+
+    op.create_table('apartment_supplies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('apartment_id', sa.Integer(), nullable=False),
+    sa.Column('supply_id', sa.Integer(), nullable=False),
+    sa.Column('required_quantity', sa.Integer(), nullable=True),
+    sa.Column('min_quantity', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['apartment_id'], ['apartments.id'], ),
+    sa.ForeignKeyConstraint(['supply_id'], ['supplies.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('apartment_supplies', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_apartment_supplies_id'), ['id'], unique=False)
+
+    op.create_table('rooms',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('apartment_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['apartment_id'], ['apartments.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('rooms', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_rooms_id'), ['id'], unique=False)
+
+    op.create_table('work_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('apartment_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['apartment_id'], ['apartments.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('work_sessions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_work_sessions_id'), ['id'], unique=False)
+
+    op.create_table('checklist_completions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('checklist_item_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('work_session_id', sa.Integer(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('value_number', sa.Integer(), nullable=True),
+    sa.Column('value_bool', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['checklist_item_id'], ['checklist_items.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['work_session_id'], ['work_sessions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('checklist_completions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_checklist_completions_id'), ['id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('checklist_completions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_checklist_completions_id'))
+
+    op.drop_table('checklist_completions')
+    with op.batch_alter_table('work_sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_work_sessions_id'))
+
+    op.drop_table('work_sessions')
+    with op.batch_alter_table('rooms', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_rooms_id'))
+
+    op.drop_table('rooms')
+    with op.batch_alter_table('apartment_supplies', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_apartment_supplies_id'))
+
+    op.drop_table('apartment_supplies')
+    with op.batch_alter_table('apartment_checklist_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_apartment_checklist_items_id'))
+
+    op.drop_table('apartment_checklist_items')
+    with op.batch_alter_table('supply_alerts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_supply_alerts_id'))
+
+    op.drop_table('supply_alerts')
+    with op.batch_alter_table('apartments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_apartments_id'))
+
+    op.drop_table('apartments')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('supplies', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_supplies_id'))
+
+    op.drop_table('supplies')
+    with op.batch_alter_table('properties', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_properties_id'))
+
+    op.drop_table('properties')
+    with op.batch_alter_table('checklist_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_checklist_items_id'))
+
+    op.drop_table('checklist_items')
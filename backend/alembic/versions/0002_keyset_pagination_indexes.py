@@ -0,0 +1,29 @@
+"""Indici (timestamp, id) per la paginazione keyset
+
+Sostituisce migrate_pagination_indexes.py
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: i database già migrati con lo script hanno questi indici
+    op.create_index('ix_checklist_completions_completed_at_id', 'checklist_completions', ['completed_at', 'id'], if_not_exists=True)
+    op.create_index('ix_work_sessions_start_time_id', 'work_sessions', ['start_time', 'id'], if_not_exists=True)
+    op.create_index('ix_supply_alerts_created_at_id', 'supply_alerts', ['created_at', 'id'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_supply_alerts_created_at_id', table_name='supply_alerts')
+    op.drop_index('ix_work_sessions_start_time_id', table_name='work_sessions')
+    op.drop_index('ix_checklist_completions_completed_at_id', table_name='checklist_completions')
@@ -0,0 +1,65 @@
+"""apartment_id su checklist_completions, copiato dalla work session
+
+Sostituisce migrate_completion_apartment.py: il backfill resta un UPDATE per insieme
+di righe, ripetuto su intervalli di id da 5000 righe, ognuno nella sua transazione
+(lock brevi e nessuna transazione enorme sulle tabelle grandi)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill_apartment_id():
+    bind = op.get_bind()
+    first_id, last_id = bind.execute(sa.text("""
+        SELECT MIN(id), MAX(id) FROM checklist_completions
+        WHERE apartment_id IS NULL AND work_session_id IS NOT NULL
+    """)).first()
+    if first_id is None:
+        return
+
+    update = sa.text("""
+        UPDATE checklist_completions
+        SET apartment_id = (
+            SELECT work_sessions.apartment_id
+            FROM work_sessions
+            WHERE work_sessions.id = checklist_completions.work_session_id
+        )
+        WHERE apartment_id IS NULL AND work_session_id IS NOT NULL
+          AND id >= :start AND id < :end
+    """)
+    # In autocommit ogni UPDATE è una transazione a sé
+    with op.get_context().autocommit_block():
+        for start in range(first_id, last_id + 1, BATCH_SIZE):
+            bind.execute(update, {"start": start, "end": start + BATCH_SIZE})
+
+
+def upgrade():
+    columns = [column['name'] for column in sa.inspect(op.get_bind()).get_columns('checklist_completions')]
+    if 'apartment_id' not in columns:
+        # Su SQLite la foreign key richiede di ricreare la tabella (batch mode)
+        with op.batch_alter_table('checklist_completions', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('apartment_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_checklist_completions_apartment_id', 'apartments', ['apartment_id'], ['id'])
+
+    op.create_index('ix_checklist_completions_apartment_id_completed_at', 'checklist_completions', ['apartment_id', 'completed_at'], if_not_exists=True)
+
+    _backfill_apartment_id()
+
+
+def downgrade():
+    op.drop_index('ix_checklist_completions_apartment_id_completed_at', table_name='checklist_completions')
+    with op.batch_alter_table('checklist_completions', schema=None) as batch_op:
+        batch_op.drop_column('apartment_id')
@@ -0,0 +1,88 @@
+"""Riepilogo giornaliero per appartamento e chiavi di idempotenza dei completamenti
+
+Il riepilogo viene popolato con un unico INSERT ... SELECT raggruppato
+(stesso risultato di rebuild_daily_stats.py)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def _populate_daily_stats():
+    if op.get_bind().dialect.name == 'postgresql':
+        completion_day = "CAST(c.completed_at AS DATE)"
+        session_day = "CAST(s.start_time AS DATE)"
+        session_minutes = "CAST(FLOOR(EXTRACT(EPOCH FROM s.end_time - s.start_time) / 60) AS INTEGER)"
+    else:
+        completion_day = "date(c.completed_at)"
+        session_day = "date(s.start_time)"
+        session_minutes = "(CAST(strftime('%s', s.end_time) AS INTEGER) - CAST(strftime('%s', s.start_time) AS INTEGER)) / 60"
+
+    op.execute(f"""
+        INSERT INTO apartment_daily_stats
+            (apartment_id, day, user_id, completions_count, mandatory_count, session_minutes)
+        SELECT apartment_id, day, user_id,
+               SUM(completions_count), SUM(mandatory_count), SUM(session_minutes)
+        FROM (
+            SELECT c.apartment_id, {completion_day} AS day, c.user_id,
+                   1 AS completions_count,
+                   CASE WHEN i.is_mandatory THEN 1 ELSE 0 END AS mandatory_count,
+                   0 AS session_minutes
+            FROM checklist_completions c
+            JOIN checklist_items i ON i.id = c.checklist_item_id
+            WHERE c.apartment_id IS NOT NULL AND c.completed_at IS NOT NULL
+            UNION ALL
+            SELECT s.apartment_id, {session_day} AS day, s.user_id,
+                   0, 0, {session_minutes}
+            FROM work_sessions s
+            WHERE s.end_time IS NOT NULL
+        ) AS stats
+        GROUP BY apartment_id, day, user_id
+    """)
+
+
+def upgrade():
+    # Le tabelle nuove potevano già essere state create da create_all all'avvio dell'app
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'apartment_daily_stats' not in existing:
+        op.create_table('apartment_daily_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('apartment_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('completions_count', sa.Integer(), nullable=False),
+        sa.Column('mandatory_count', sa.Integer(), nullable=False),
+        sa.Column('session_minutes', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['apartment_id'], ['apartments.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('apartment_id', 'day', 'user_id', name='uq_apartment_daily_stats_apartment_day_user')
+        )
+        op.create_index('ix_apartment_daily_stats_id', 'apartment_daily_stats', ['id'], unique=False)
+        _populate_daily_stats()
+
+    if 'completion_idempotency_keys' not in existing:
+        op.create_table('completion_idempotency_keys',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('work_session_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['work_session_id'], ['work_sessions.id'], ),
+        sa.PrimaryKeyConstraint('key')
+        )
+
+
+def downgrade():
+    op.drop_table('completion_idempotency_keys')
+    op.drop_index('ix_apartment_daily_stats_id', table_name='apartment_daily_stats')
+    op.drop_table('apartment_daily_stats')
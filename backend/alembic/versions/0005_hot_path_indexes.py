@@ -0,0 +1,51 @@
+"""Indici univoci sulle assegnazioni e indici compositi sui percorsi più usati
+
+Sostituisce migrate_hot_path_indexes.py
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# Stesso logger dei messaggi "Running upgrade" di Alembic
+log = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade():
+    # Le assegnazioni duplicate impedirebbero gli indici univoci: resta la più vecchia
+    for table, key in (
+        ('apartment_checklist_items', 'apartment_id, checklist_item_id'),
+        ('apartment_supplies', 'apartment_id, supply_id'),
+    ):
+        removed = op.get_bind().execute(sa.text(f"""
+            DELETE FROM {table}
+            WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY {key})
+        """)).rowcount
+        log.info("Eliminate %d assegnazioni duplicate da %s (resta la più vecchia per %s)", removed, table, key)
+
+    op.create_index('ux_apartment_checklist_items_apartment_item', 'apartment_checklist_items', ['apartment_id', 'checklist_item_id'], unique=True, if_not_exists=True)
+    op.create_index('ux_apartment_supplies_apartment_supply', 'apartment_supplies', ['apartment_id', 'supply_id'], unique=True, if_not_exists=True)
+    op.create_index('ix_checklist_completions_work_session_id', 'checklist_completions', ['work_session_id'], if_not_exists=True)
+    op.create_index('ix_checklist_completions_checklist_item_id_completed_at', 'checklist_completions', ['checklist_item_id', 'completed_at'], if_not_exists=True)
+    op.create_index('ix_work_sessions_apartment_id_start_time', 'work_sessions', ['apartment_id', 'start_time'], if_not_exists=True)
+    op.create_index('ix_supply_alerts_is_resolved_created_at', 'supply_alerts', ['is_resolved', 'created_at'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_supply_alerts_is_resolved_created_at', table_name='supply_alerts')
+    op.drop_index('ix_work_sessions_apartment_id_start_time', table_name='work_sessions')
+    op.drop_index('ix_checklist_completions_checklist_item_id_completed_at', table_name='checklist_completions')
+    op.drop_index('ix_checklist_completions_work_session_id', table_name='checklist_completions')
+    op.drop_index('ux_apartment_supplies_apartment_supply', table_name='apartment_supplies')
+    op.drop_index('ux_apartment_checklist_items_apartment_item', table_name='apartment_checklist_items')
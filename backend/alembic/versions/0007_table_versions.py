@@ -0,0 +1,31 @@
+"""Contatori delle scritture per tabella, usati come validatori per le GET condizionali
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# Tabelle con le liste servite con ETag (app.table_versions.TRACKED_TABLES)
+TRACKED_TABLES = ('properties', 'apartments', 'rooms', 'users')
+
+
+def upgrade():
+    table_versions = op.create_table('table_versions',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [{'table_name': name, 'version': 0} for name in TRACKED_TABLES])
+
+
+def downgrade():
+    op.drop_table('table_versions')
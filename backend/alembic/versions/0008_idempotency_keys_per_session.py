@@ -0,0 +1,49 @@
+"""Chiavi di idempotenza dei completamenti univoche per work session
+
+La chiave primaria passa da key a (work_session_id, key): la tabella viene ricreata
+e le chiavi esistenti copiate con un unico INSERT ... SELECT
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def _recreate(primary_key, select):
+    op.create_table('completion_idempotency_keys_new',
+    sa.Column('work_session_id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['work_session_id'], ['work_sessions.id'], ),
+    sa.PrimaryKeyConstraint(*primary_key)
+    )
+    op.execute(f"""
+        INSERT INTO completion_idempotency_keys_new (work_session_id, key, created_at)
+        {select}
+    """)
+    op.drop_table('completion_idempotency_keys')
+    op.rename_table('completion_idempotency_keys_new', 'completion_idempotency_keys')
+
+
+def upgrade():
+    _recreate(
+        ('work_session_id', 'key'),
+        "SELECT work_session_id, key, created_at FROM completion_idempotency_keys"
+    )
+
+
+def downgrade():
+    # Una chiave usata in più sessioni resta solo per la prima
+    _recreate(
+        ('key',),
+        "SELECT MIN(work_session_id), key, MIN(created_at) FROM completion_idempotency_keys GROUP BY key"
+    )
@@ -1,23 +1,120 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from threading import Lock
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
 from jose import JWTError, jwt
-import hashlib
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from .cache import Invalidation, TTLCache
 from .config import settings
-from .database import get_db
-from . import models
+from .database import get_db, get_async_db
+from . import cache, models, passwords
 
 security = HTTPBearer()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return hashlib.sha256(plain_password.encode()).hexdigest() == hashed_password
+class CurrentUser(NamedTuple):
+    """Identità dell'utente autenticato, letta dai claim del token (uid, sub, role)"""
+    id: int
+    email: str
+    role: str
+
+
+class UserProfile(NamedTuple):
+    """Dati completi dell'utente autenticato: copia in cache, non legata a una sessione del database"""
+    id: int
+    email: str
+    name: str
+    role: str
+    created_at: Optional[datetime]
+
+
+class TokenVersions:
+    """
+    Tabella in memoria uid -> token_version di tutti gli utenti.
+    Un token è valido solo se il suo claim token_version coincide: incrementando
+    la versione di un utente i suoi token esistenti vengono revocati.
+    Viene ricaricata ogni AUTH_TOKEN_VERSIONS_REFRESH_SECONDS (modifiche fatte da altri worker)
+    e aggiornata subito dopo le modifiche agli utenti fatte da questo processo.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = Lock()
+
+    def is_stale(self, max_age: Optional[float] = None) -> bool:
+        max_age = self.refresh_seconds if max_age is None else max_age
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > max_age
+
+    def load(self, rows: Iterable[Tuple[int, int]]):
+        versions = {user_id: version for user_id, version in rows}
+        with self._lock:
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+
+    def mark_stale(self):
+        """La prossima richiesta ricarica la tabella (utente modificato da un altro worker)"""
+        with self._lock:
+            self._loaded_at = None
+
+    def get(self, user_id: int) -> Optional[int]:
+        return self._versions.get(user_id)
+
+    def set(self, user_id: int, version: int):
+        with self._lock:
+            self._versions[user_id] = version
+
+    def remove(self, user_id: int):
+        with self._lock:
+            self._versions.pop(user_id, None)
+
+
+token_versions = TokenVersions(settings.AUTH_TOKEN_VERSIONS_REFRESH_SECONDS)
+
+# Email (subject del token) -> UserProfile; evita la query sugli utenti per /auth/me e i token senza claim
+_user_cache = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+_TOKEN_VERSIONS_QUERY = select(models.User.id, models.User.token_version)
+
+
+def _cache_user(user: models.User) -> UserProfile:
+    snapshot = UserProfile(user.id, user.email, user.name, user.role, user.created_at)
+    return _user_cache.set(user.email, snapshot)
+
+
+def user_changed(user: models.User, previous_email: Optional[str] = None):
+    """Da chiamare dopo il commit di una modifica a un utente"""
+    _user_cache.delete(user.email)
+    if previous_email:
+        _user_cache.delete(previous_email)
+    token_versions.set(user.id, user.token_version)
+    cache.publish("users", user.id)
+
+
+def user_deleted(user_id: int, email: str):
+    """Da chiamare dopo il commit dell'eliminazione di un utente: i suoi token non sono più validi"""
+    _user_cache.delete(email)
+    token_versions.remove(user_id)
+    cache.publish("users", user_id)
+
+
+def _on_invalidation(message: Invalidation):
+    # Utente modificato da un altro worker: la cache è indicizzata per email, si svuota tutta
+    if message.table == "users":
+        _user_cache.clear()
+        token_versions.mark_stale()
+
+
+cache.subscribe(_on_invalidation)
 
 
 def get_password_hash(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+    return passwords.hash_password(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -31,37 +128,129 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> models.User:
-    credentials_exception = HTTPException(
+def create_user_token(user: models.User) -> str:
+    """Token con id, ruolo e versione: identità e controllo admin non richiedono il database"""
+    token_versions.set(user.id, user.token_version)
+    return create_access_token(data={
+        "sub": user.email,
+        "uid": user.id,
+        "role": user.role,
+        "token_version": user.token_version,
+    })
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _decode_token(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decodifica il JWT e verifica che contenga l'email in 'sub'"""
     try:
         token = credentials.credentials
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        if payload.get("sub") is None:
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
+    return payload
+
+
+def _has_claims(payload: dict) -> bool:
+    # I token emessi prima dei claim contengono solo 'sub' e restano validi fino alla scadenza
+    return all(payload.get(claim) is not None for claim in ("uid", "role", "token_version"))
+
+
+def _versions_outdated(payload: dict) -> bool:
+    """True se la tabella delle versioni va ricaricata prima di validare il token"""
+    if token_versions.is_stale():
+        return True
+    # Utente creato da un altro worker dopo l'ultimo caricamento (al massimo un ricaricamento al secondo)
+    return token_versions.get(payload["uid"]) is None and token_versions.is_stale(1.0)
+
+
+def _user_from_claims(payload: dict) -> CurrentUser:
+    if token_versions.get(payload["uid"]) != payload["token_version"]:
+        # Utente eliminato oppure token revocato (cambio ruolo, email o password)
+        raise _credentials_exception()
+    return CurrentUser(payload["uid"], payload["sub"], payload["role"])
+
+
+def _load_profile(db: Session, email: str) -> UserProfile:
+    cached = _user_cache.get(email)
+    if cached is not None:
+        return cached
+
     user = db.query(models.User).filter(models.User.email == email).first()
     if user is None:
-        raise credentials_exception
-    
-    return user
+        raise _credentials_exception()
+
+    return _cache_user(user)
+
+
+async def _load_profile_async(db: AsyncSession, email: str) -> UserProfile:
+    cached = _user_cache.get(email)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    user = result.scalars().first()
+    if user is None:
+        raise _credentials_exception()
+
+    return _cache_user(user)
+
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> CurrentUser:
+    payload = _decode_token(credentials)
+
+    if not _has_claims(payload):
+        profile = _load_profile(db, payload["sub"])
+        return CurrentUser(profile.id, profile.email, profile.role)
+
+    # La sessione viene aperta solo se la tabella delle versioni va ricaricata
+    if _versions_outdated(payload):
+        token_versions.load(db.execute(_TOKEN_VERSIONS_QUERY).all())
+
+    return _user_from_claims(payload)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """Come get_current_user, ma con la sessione async (per gli endpoint async def)"""
+    payload = _decode_token(credentials)
+
+    if not _has_claims(payload):
+        profile = await _load_profile_async(db, payload["sub"])
+        return CurrentUser(profile.id, profile.email, profile.role)
+
+    if _versions_outdated(payload):
+        token_versions.load((await db.execute(_TOKEN_VERSIONS_QUERY)).all())
+
+    return _user_from_claims(payload)
 
-def get_current_admin_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+
+async def get_user_profile_async(
+    current_user: CurrentUser = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserProfile:
+    """Nome e data di creazione dell'utente autenticato (dalla cache, altrimenti dal database)"""
+    return await _load_profile_async(db, current_user.email)
+
+
+def get_current_admin_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     return current_user
-
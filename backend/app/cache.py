@@ -0,0 +1,273 @@
+"""
+Cache in memoria e backend delle risposte in cache
+
+Il backend si sceglie con CACHE_BACKEND: 'memory' (default, LRU per processo) oppure
+'redis' (condiviso tra i worker, con le invalidazioni inviate a tutti tramite pub/sub).
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional
+import json
+import logging
+import time
+import uuid
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Cache in memoria con scadenza (ttl in secondi) e numero massimo di voci:
+    oltre maxsize viene tolta la voce usata meno di recente.
+    Sicura tra thread; ogni processo (worker) ha la sua.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> Any:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return value
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class Invalidation(NamedTuple):
+    """Messaggio inviato agli altri worker dopo una modifica: tabella e id della riga (None = più righe)"""
+    table: str
+    entity_id: Optional[int] = None
+
+
+class CacheBackend:
+    """
+    Archivio delle risposte in cache più canale di invalidazione tra worker.
+    Le voci sono divise per namespace (la tabella da cui dipendono) e generazione:
+    invalidate() passa a una nuova generazione, così le voci precedenti non vengono più lette
+    (anche quelle scritte da una richiesta iniziata prima della modifica).
+    """
+
+    def generation(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def get(self, namespace: str, generation: int, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, namespace: str, generation: int, key: str, value: bytes):
+        raise NotImplementedError
+
+    def invalidate(self, namespace: str):
+        raise NotImplementedError
+
+    def publish(self, message: Invalidation):
+        """Invia il messaggio agli altri worker (non a questo)"""
+        raise NotImplementedError
+
+    def start(self, on_message: Callable[[Invalidation], None]):
+        """Inizia a ricevere i messaggi degli altri worker"""
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """LRU in memoria, per processo: con più worker ognuno ha la sua e non riceve le invalidazioni degli altri"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize, ttl)
+        self._generations: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def get(self, namespace: str, generation: int, key: str) -> Optional[bytes]:
+        return self._entries.get((namespace, generation, key))
+
+    def set(self, namespace: str, generation: int, key: str, value: bytes):
+        self._entries.set((namespace, generation, key), value)
+
+    def invalidate(self, namespace: str):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def publish(self, message: Invalidation):
+        pass
+
+    def start(self, on_message: Callable[[Invalidation], None]):
+        pass
+
+
+class LocalBroker:
+    """
+    Sostituto in memoria del backend condiviso, per i test: ogni connect() è un "worker"
+    con lo stesso archivio, e i messaggi pubblicati da uno arrivano a tutti gli altri
+
+        broker = LocalBroker()
+        worker_a, worker_b = broker.connect(), broker.connect()
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.store = MemoryBackend(maxsize, ttl)
+        self.clients: List["LocalBrokerBackend"] = []
+
+    def connect(self) -> "LocalBrokerBackend":
+        client = LocalBrokerBackend(self)
+        self.clients.append(client)
+        return client
+
+
+class LocalBrokerBackend(CacheBackend):
+    def __init__(self, broker: LocalBroker):
+        self.broker = broker
+        self.received: List[Invalidation] = []
+        self._on_message: Optional[Callable[[Invalidation], None]] = None
+
+    def generation(self, namespace: str) -> int:
+        return self.broker.store.generation(namespace)
+
+    def get(self, namespace: str, generation: int, key: str) -> Optional[bytes]:
+        return self.broker.store.get(namespace, generation, key)
+
+    def set(self, namespace: str, generation: int, key: str, value: bytes):
+        self.broker.store.set(namespace, generation, key, value)
+
+    def invalidate(self, namespace: str):
+        self.broker.store.invalidate(namespace)
+
+    def publish(self, message: Invalidation):
+        for client in self.broker.clients:
+            if client is not self:
+                client.deliver(message)
+
+    def start(self, on_message: Callable[[Invalidation], None]):
+        self._on_message = on_message
+
+    def deliver(self, message: Invalidation):
+        self.received.append(message)
+        if self._on_message is not None:
+            self._on_message(message)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis condiviso tra i worker (richiede il pacchetto redis): le risposte stanno in un hash
+    per namespace e generazione, le invalidazioni viaggiano su un canale pub/sub
+    """
+
+    CHANNEL = "cache-invalidation"
+
+    def __init__(self, url: str, ttl: float):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis richiede il pacchetto redis (pip install redis)")
+        self._redis = redis.Redis.from_url(url)
+        self._ttl = max(1, int(ttl))
+        # Per riconoscere (e ignorare) i messaggi pubblicati da questo processo
+        self._origin = uuid.uuid4().hex
+        self._thread = None
+
+    def generation(self, namespace: str) -> int:
+        return int(self._redis.get(f"cache:{namespace}:generation") or 0)
+
+    def get(self, namespace: str, generation: int, key: str) -> Optional[bytes]:
+        return self._redis.hget(f"cache:{namespace}:{generation}", key)
+
+    def set(self, namespace: str, generation: int, key: str, value: bytes):
+        name = f"cache:{namespace}:{generation}"
+        pipe = self._redis.pipeline()
+        pipe.hset(name, key, value)
+        pipe.expire(name, self._ttl)
+        pipe.execute()
+
+    def invalidate(self, namespace: str):
+        self._redis.incr(f"cache:{namespace}:generation")
+
+    def publish(self, message: Invalidation):
+        payload = {"origin": self._origin, "table": message.table, "entity_id": message.entity_id}
+        self._redis.publish(self.CHANNEL, json.dumps(payload))
+
+    def start(self, on_message: Callable[[Invalidation], None]):
+        def handle(raw):
+            payload = json.loads(raw["data"])
+            if payload["origin"] != self._origin:
+                on_message(Invalidation(payload["table"], payload["entity_id"]))
+
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.CHANNEL: handle})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+
+def create_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+    if settings.CACHE_BACKEND != "memory":
+        raise ValueError(f"CACHE_BACKEND non valido: {settings.CACHE_BACKEND} (memory o redis)")
+    return MemoryBackend(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+# Callback per i messaggi degli altri worker, es. auth svuota la cache degli utenti
+_subscribers: List[Callable[[Invalidation], None]] = []
+
+
+def _deliver(message: Invalidation):
+    for callback in _subscribers:
+        try:
+            callback(message)
+        except Exception:
+            logger.exception("Errore nella gestione dell'invalidazione %s", message)
+
+
+def subscribe(callback: Callable[[Invalidation], None]):
+    _subscribers.append(callback)
+
+
+def configure(new_backend: CacheBackend):
+    """Sostituisce il backend (es. LocalBroker nei test)"""
+    global backend
+    backend = new_backend
+    backend.start(_deliver)
+
+
+def publish(table: str, entity_id: Optional[int] = None):
+    """
+    Da chiamare dopo il commit di una modifica: le risposte in cache che dipendono dalla
+    tabella non vengono più servite e gli altri worker aggiornano il loro stato in memoria
+    """
+    backend.invalidate(table)
+    backend.publish(Invalidation(table, entity_id))
+
+
+backend: CacheBackend = create_backend()
+backend.start(_deliver)
@@ -1,9 +1,12 @@
 from pydantic_settings import BaseSettings
 from typing import List
+import os
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Replica di sola lettura (standby PostgreSQL o snapshot SQLite); vuoto = DATABASE_URL
+    DATABASE_READ_URL: str = ""
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 43200
@@ -14,6 +17,47 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
 
+    # Profilo SQLite, applicato a ogni nuova connessione
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_FOREIGN_KEYS: bool = True
+
+    # Statistiche query per richiesta: header Server-Timing e avviso quando
+    # la stessa query viene ripetuta più di N volte (0 = avviso disattivato)
+    QUERY_STATS_HEADER: bool = True
+    QUERY_REPEAT_THRESHOLD: int = 10
+
+    # Cache dell'utente autenticato (email del token -> id, nome, ruolo)
+    AUTH_USER_CACHE_SIZE: int = 1024
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60
+    # Ogni quanto ricaricare uid -> token_version (revoca dei token fatta da altri worker)
+    AUTH_TOKEN_VERSIONS_REFRESH_SECONDS: float = 30
+
+    # Hash delle password: 'bcrypt' oppure 'argon2' (richiede argon2-cffi)
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_MEMORY_COST: int = 65536  # KiB
+    # Hash/verifiche contemporanee al massimo (thread dedicati): di default metà dei core,
+    # il resto della CPU resta agli altri endpoint durante i picchi di login
+    PASSWORD_HASH_MAX_CONCURRENCY: int = max(1, (os.cpu_count() or 2) // 2)
+
+    # Log delle query lente con piano di esecuzione (0 = disattivato)
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_MAX_ENTRIES: int = 500
+
+    # Cache delle risposte dei cataloghi (checklist e scorte globali), per filtro (0 = disattivata)
+    RESPONSE_CACHE_SIZE: int = 256
+    RESPONSE_CACHE_TTL_SECONDS: float = 300
+    # 'memory' (per processo) oppure 'redis' (condivisa tra i worker, richiede il pacchetto redis)
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
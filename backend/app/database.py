@@ -1,14 +1,98 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 from .config import settings
+from .query_stats import instrument_engine
+from .table_versions import track_writes
 
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
 
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Imposta WAL e le altre pragma su ogni connessione SQLite"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    # Un valore negativo indica la dimensione in KiB invece che in pagine
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}")
+    cursor.execute(f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}")
+    cursor.close()
+
+
+def _apply_sqlite_read_pragmas(dbapi_connection, connection_record):
+    """Pragma per lo snapshot SQLite di sola lettura (nessuna modifica al journal)"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}")
+    cursor.close()
+
+
+def _async_database_url(url: str):
+    """Stesso database con il driver async: aiosqlite per SQLite, asyncpg per PostgreSQL"""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+asyncpg")
+    return url
+
+
+# Engine async per gli endpoint di lettura più frequenti (non occupano il threadpool)
+async_engine = create_async_engine(_async_database_url(settings.DATABASE_URL))
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+# Engine di sola lettura: replica PostgreSQL o snapshot SQLite aggiornato periodicamente.
+# Senza DATABASE_READ_URL le letture usano il database principale.
+if settings.DATABASE_READ_URL:
+    if "sqlite" in settings.DATABASE_READ_URL:
+        # NullPool: ogni richiesta apre il file, così vede subito lo snapshot aggiornato
+        read_engine = create_engine(
+            settings.DATABASE_READ_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=NullPool
+        )
+        async_read_engine = create_async_engine(
+            _async_database_url(settings.DATABASE_READ_URL),
+            poolclass=NullPool
+        )
+        event.listen(read_engine, "connect", _apply_sqlite_read_pragmas)
+        event.listen(async_read_engine.sync_engine, "connect", _apply_sqlite_read_pragmas)
+    else:
+        read_engine = create_engine(settings.DATABASE_READ_URL)
+        async_read_engine = create_async_engine(_async_database_url(settings.DATABASE_READ_URL))
+else:
+    read_engine = engine
+    async_read_engine = async_engine
+
+# Conteggio query per richiesta (Server-Timing e avviso N+1)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+if read_engine is not engine:
+    instrument_engine(read_engine)
+    instrument_engine(async_read_engine.sync_engine)
+
+# Contatori delle scritture per tabella (ETag delle liste), aggiornati da ogni sessione ORM
+track_writes(Session)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -20,3 +104,21 @@ def get_db():
     finally:
         db.close()
 
+
+def get_read_db():
+    """Sessione per gli endpoint GET che tollerano un piccolo ritardo della replica"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
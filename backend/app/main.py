@@ -1,7 +1,10 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
-from .database import engine, Base
+from .query_stats import count_queries
+from .slow_queries import track_route
 from .routers import (
     auth,
     properties,
@@ -13,16 +16,22 @@ from .routers import (
     supply_alerts,
     users,
     email,
-    work_sessions
+    work_sessions,
+    dashboard,
+    exports,
+    diagnostics
 )
 
-# Crea le tabelle nel database
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+# Lo schema del database è gestito da Alembic (alembic upgrade head al deploy)
 
 app = FastAPI(
     title="Perfect House API",
     description="API per la gestione della pulizia degli appartamenti",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson al posto di json.dumps per tutte le risposte costruite da FastAPI
+    default_response_class=ORJSONResponse
 )
 
 # Configurazione CORS
@@ -32,8 +41,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
 )
 
+
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    """Conta le query della richiesta e segnala le query ripetute (probabile N+1)"""
+    with count_queries() as counter, track_route(request.scope):
+        response = await call_next(request)
+
+    if settings.QUERY_STATS_HEADER:
+        response.headers["Server-Timing"] = counter.server_timing()
+
+    if settings.QUERY_REPEAT_THRESHOLD > 0:
+        for shape, count in counter.repeated(settings.QUERY_REPEAT_THRESHOLD).items():
+            logger.warning(
+                "Possibile N+1 su %s %s: query eseguita %d volte: %s",
+                request.method, request.url.path, count, shape
+            )
+
+    return response
+
 # Registra i router
 app.include_router(auth.router, prefix="/api")
 app.include_router(properties.router, prefix="/api")
@@ -46,6 +75,9 @@ app.include_router(supply_alerts.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(email.router, prefix="/api")
 app.include_router(work_sessions.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
+app.include_router(diagnostics.router, prefix="/api")
 
 
 @app.get("/")
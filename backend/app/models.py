@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Text, Float, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -12,6 +12,7 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     name = Column(String, nullable=False)
     role = Column(String, nullable=False)  # 'admin' o 'operator'
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)  # Incrementata per revocare i token emessi
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relazioni
@@ -96,6 +97,10 @@ class ChecklistItem(Base):
 class ApartmentChecklistItem(Base):
     """Collegamento tra appartamenti e checklist - indica quali checklist servono per ogni appartamento"""
     __tablename__ = "apartment_checklist_items"
+    __table_args__ = (
+        # Una checklist può essere assegnata una sola volta allo stesso appartamento
+        Index("ux_apartment_checklist_items_apartment_item", "apartment_id", "checklist_item_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     apartment_id = Column(Integer, ForeignKey("apartments.id"), nullable=False)
@@ -111,6 +116,12 @@ class ApartmentChecklistItem(Base):
 
 class WorkSession(Base):
     __tablename__ = "work_sessions"
+    __table_args__ = (
+        # Paginazione keyset (start_time, id)
+        Index("ix_work_sessions_start_time_id", "start_time", "id"),
+        # Storico sessioni di un appartamento
+        Index("ix_work_sessions_apartment_id_start_time", "apartment_id", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -124,15 +135,26 @@ class WorkSession(Base):
     user = relationship("User", back_populates="work_sessions")
     apartment = relationship("Apartment", back_populates="work_sessions")
     completions = relationship("ChecklistCompletion", back_populates="work_session", cascade="all, delete-orphan")
+    idempotency_keys = relationship("CompletionIdempotencyKey", cascade="all, delete-orphan")
 
 
 class ChecklistCompletion(Base):
     __tablename__ = "checklist_completions"
+    __table_args__ = (
+        # Paginazione keyset (completed_at, id)
+        Index("ix_checklist_completions_completed_at_id", "completed_at", "id"),
+        # Storico per appartamento senza join su work_sessions
+        Index("ix_checklist_completions_apartment_id_completed_at", "apartment_id", "completed_at"),
+        Index("ix_checklist_completions_work_session_id", "work_session_id"),
+        # Storico di una singola checklist
+        Index("ix_checklist_completions_checklist_item_id_completed_at", "checklist_item_id", "completed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     checklist_item_id = Column(Integer, ForeignKey("checklist_items.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     work_session_id = Column(Integer, ForeignKey("work_sessions.id"), nullable=True)
+    apartment_id = Column(Integer, ForeignKey("apartments.id"), nullable=True)  # Copiato dalla work session alla creazione
     completed_at = Column(DateTime, default=datetime.utcnow)
     notes = Column(Text, nullable=True)
     
@@ -146,6 +168,40 @@ class ChecklistCompletion(Base):
     work_session = relationship("WorkSession", back_populates="completions")
 
 
+class ApartmentDailyStats(Base):
+    """Riepilogo giornaliero per appartamento e operatore, aggiornato insieme a completamenti e work session"""
+    __tablename__ = "apartment_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("apartment_id", "day", "user_id", name="uq_apartment_daily_stats_apartment_day_user"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    apartment_id = Column(Integer, ForeignKey("apartments.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    completions_count = Column(Integer, default=0, nullable=False)
+    mandatory_count = Column(Integer, default=0, nullable=False)  # Completamenti di checklist obbligatorie
+    session_minutes = Column(Integer, default=0, nullable=False)  # Durata delle work session chiuse
+
+
+class CompletionIdempotencyKey(Base):
+    """Chiavi di idempotenza già applicate dall'endpoint batch dei completamenti (evita duplicati sui retry)"""
+    __tablename__ = "completion_idempotency_keys"
+
+    # Chiave univoca per sessione: la stessa chiave in un'altra sessione è un'operazione diversa
+    work_session_id = Column(Integer, ForeignKey("work_sessions.id"), primary_key=True)
+    key = Column(String, primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class TableVersion(Base):
+    """Contatore delle scritture per tabella, incrementato nella stessa transazione delle modifiche (ETag delle liste)"""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+
 class Supply(Base):
     """Scorte globali - non legate a un appartamento specifico"""
     __tablename__ = "supplies"
@@ -169,6 +225,10 @@ class Supply(Base):
 class ApartmentSupply(Base):
     """Collegamento tra appartamenti e scorte - indica quali scorte servono per ogni appartamento"""
     __tablename__ = "apartment_supplies"
+    __table_args__ = (
+        # Una scorta può essere assegnata una sola volta allo stesso appartamento
+        Index("ux_apartment_supplies_apartment_supply", "apartment_id", "supply_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     apartment_id = Column(Integer, ForeignKey("apartments.id"), nullable=False)
@@ -185,6 +245,12 @@ class ApartmentSupply(Base):
 
 class SupplyAlert(Base):
     __tablename__ = "supply_alerts"
+    __table_args__ = (
+        # Paginazione keyset (created_at, id)
+        Index("ix_supply_alerts_created_at_id", "created_at", "id"),
+        # Alert aperti/risolti ordinati per data
+        Index("ix_supply_alerts_is_resolved_created_at", "is_resolved", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     supply_id = Column(Integer, ForeignKey("supplies.id"), nullable=False)
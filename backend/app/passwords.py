@@ -0,0 +1,60 @@
+"""
+Hashing delle password con passlib (bcrypt di default, argon2 con argon2-cffi installato)
+
+Hash e verifica sono CPU-bound: girano in un pool di thread dedicato con al massimo
+PASSWORD_HASH_MAX_CONCURRENCY operazioni contemporanee, così un picco di login
+non occupa l'event loop né il threadpool degli altri endpoint (bcrypt e argon2
+rilasciano il GIL durante il calcolo).
+Gli hash SHA-256 senza sale delle versioni precedenti vengono riconosciuti e
+sostituiti con il nuovo schema al primo login riuscito.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+
+from passlib.context import CryptContext
+
+from .config import settings
+
+password_context = CryptContext(
+    schemes=["bcrypt", "argon2", "hex_sha256"],
+    default=settings.PASSWORD_HASH_SCHEME,
+    # Ogni schema diverso da quello di default (o con costo diverso) viene aggiornato al login
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    argon2__time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+    argon2__memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST,
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    thread_name_prefix="password-hash"
+)
+
+
+def _verify_and_update(password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    if hashed_password is None:
+        # Utente inesistente: stesso tempo di risposta di una password sbagliata
+        password_context.dummy_verify()
+        return False, None
+    return password_context.verify_and_update(password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    """Versione sincrona, per gli endpoint def e gli script (attende il pool dedicato)"""
+    return _executor.submit(password_context.hash, password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, password_context.hash, password)
+
+
+async def verify_and_update_async(password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la password; se è corretta ma l'hash è di uno schema vecchio (o con costo diverso)
+    restituisce anche il nuovo hash da salvare
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, _verify_and_update, password, hashed_password)
@@ -0,0 +1,125 @@
+"""
+Conteggio delle query SQL per richiesta e rilevamento dei pattern N+1
+
+Gli engine vengono strumentati con gli eventi before/after_cursor_execute;
+le query eseguite dentro count_queries() (il middleware lo apre per ogni
+richiesta) vengono registrate nel QueryCounter corrente.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+import re
+import time
+
+from sqlalchemy import event
+
+_current_counter: ContextVar[Optional["QueryCounter"]] = ContextVar("query_counter", default=None)
+
+# Callback chiamate dopo ogni query con (conn, cursor, statement, parameters, executemany, duration)
+_query_listeners: List[Callable] = []
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Forma della query senza valori: 'IN (?, ?, ?)' e 'IN (?)' contano come la stessa query"""
+    shape = _STRING.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _VALUE_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryCounter:
+    """Numero, durata e forme delle query eseguite in una richiesta (o in un blocco count_queries())"""
+
+    def __init__(self, parent: Optional["QueryCounter"] = None):
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0  # Secondi
+        self.shapes = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+        if self.parent is not None:
+            self.parent.record(statement, duration)
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Forme eseguite più di threshold volte: di solito un lazy-load dentro un ciclo"""
+        return {shape: count for shape, count in self.shapes.items() if count > threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+    def assert_max(self, budget: int):
+        """Fallisce se sono state eseguite più di budget query (per i test)"""
+        if self.count > budget:
+            details = "\n".join(f"  {count}x {shape}" for shape, count in self.shapes.most_common())
+            raise AssertionError(f"{self.count} query eseguite, massimo {budget}:\n{details}")
+
+
+@contextmanager
+def count_queries():
+    """
+    Registra le query eseguite nel blocco:
+
+        with count_queries() as counter:
+            client.get("/api/supplies/apartment/1/supplies")
+        counter.assert_max(3)
+    """
+    counter = QueryCounter(_current_counter.get())
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def query_counter():
+    """
+    Fixture pytest per i budget di query, da registrare in conftest.py:
+
+        query_counter = pytest.fixture(query_stats.query_counter)
+    """
+    with count_queries() as counter:
+        yield counter
+
+
+def add_query_listener(listener: Callable):
+    """Registra una callback chiamata dopo ogni query con la sua durata (es. log delle query lente)"""
+    _query_listeners.append(listener)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.record(statement, duration)
+    for listener in _query_listeners:
+        listener(conn, cursor, statement, parameters, executemany, duration)
+
+
+def _handle_error(exception_context):
+    # La query fallita non arriva ad after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def instrument_engine(engine):
+    """Collega il conteggio delle query a un engine sync (per gli engine async: engine.sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
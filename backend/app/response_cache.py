@@ -0,0 +1,98 @@
+"""
+Risposte JSON con ETag e GET condizionali
+
+Cataloghi globali (checklist e scorte): la risposta già serializzata resta nel backend
+della cache (app.cache) per filtro. Gli endpoint di creazione, modifica ed eliminazione
+chiamano cache.publish() dopo il commit, quindi la prima lettura dopo una modifica la ricalcola.
+L'ETag è l'hash del contenuto, uguale tra worker e riavvii.
+
+Liste di proprietà, appartamenti, stanze e utenti: conditional_get() confronta
+If-None-Match con un ETag ricavato dai contatori delle scritture (table_versions)
+prima di eseguire la query della lista; se coincide risponde 304 senza query né serializzazione.
+"""
+
+from typing import Callable, Hashable, Optional
+import hashlib
+import json
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from . import cache
+from .database import get_read_db
+from .table_versions import versions_query
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Confronto di If-None-Match con l'ETag (confronto debole, come previsto per le GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (_opaque_tag(tag.strip()) for tag in if_none_match.split(","))
+    return _opaque_tag(etag) in candidates
+
+
+def _cache_headers(etag: str) -> dict:
+    # no-cache: il client può conservare la risposta ma deve rivalidarla a ogni uso
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Risposta JSON da bytes già serializzati, oppure 304 se il client ha già questa versione"""
+    headers = _cache_headers(etag)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cached_json(request: Request, catalog: str, key: Hashable, load: Callable[[], bytes]) -> Response:
+    """
+    Serve la risposta del catalogo per il filtro key dal backend della cache; se manca
+    (o il catalogo è cambiato) chiama load() (query e serializzazione) e la memorizza
+    """
+    backend = cache.backend
+    # La generazione si legge prima di load(): se il catalogo cambia nel frattempo
+    # la risposta finisce nella generazione vecchia e non viene più servita
+    generation = backend.generation(catalog)
+    cache_key = json.dumps(key)
+    body = backend.get(catalog, generation, cache_key)
+    if body is None:
+        body = load()
+        backend.set(catalog, generation, cache_key, body)
+    return json_response(request, body, make_etag(body))
+
+
+def conditional_get(*tables: str, db_dependency: Callable = get_read_db):
+    """
+    Dipendenza per le GET delle liste che dipendono solo da tables: risponde 304 se
+    If-None-Match coincide con i contatori attuali, altrimenti aggiunge l'ETag alla risposta.
+    Va dichiarata dopo la dipendenza dell'utente, così l'autenticazione viene verificata prima;
+    db_dependency deve essere la stessa dipendenza della sessione usata dall'endpoint.
+    """
+    query = versions_query(tables)
+
+    def check(request: Request, response: Response, db: Session = Depends(db_dependency)):
+        # Stessa sessione (e transazione) della query della lista: contatori e dati sono coerenti
+        versions = db.execute(query).all()
+        if len(versions) < len(tables):
+            # Contatori mancanti (migrazione 0007 non applicata): nessun ETag
+            return
+        validator = f"{request.url.path}?{request.url.query}|" + ",".join(
+            f"{name}:{version}" for name, version in versions
+        )
+        # ETag debole: identifica i dati, non i singoli byte della risposta
+        headers = _cache_headers("W/" + make_etag(validator.encode()))
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return check
@@ -1,31 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from .. import models, schemas, auth
-from ..database import get_db
+from .. import models, schemas, auth, response_cache
+from ..database import get_db, get_read_db
+from ..stats import delete_daily_stats
+from ..utils import dump_rows_json, json_bytes_response, parse_fields, partial_list_adapter
 
 router = APIRouter(prefix="/apartments", tags=["apartments"])
 
 
 @router.get("", response_model=List[schemas.Apartment])
 def get_apartments(
+    response: Response,
     property_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    fields: Optional[str] = Query(None, description="Campi da restituire separati da virgola (es: id,name)"),
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user),
+    not_modified: None = Depends(response_cache.conditional_get("apartments"))
 ):
-    query = db.query(models.Apartment)
+    selected = parse_fields(fields, schemas.Apartment)
+    if selected is None:
+        query = db.query(models.Apartment)
+    else:
+        # Solo le colonne richieste (es. senza notes per le liste dell'app)
+        query = db.query(*(getattr(models.Apartment, name) for name in selected))
     
     if property_id is not None:
         query = query.filter(models.Apartment.property_id == property_id)
     
-    return query.all()
+    if selected is None:
+        return query.all()
+    
+    # response porta l'ETag della GET condizionale
+    return json_bytes_response(
+        dump_rows_json(partial_list_adapter(schemas.Apartment, selected), query.all()),
+        response
+    )
 
 
 @router.post("", response_model=schemas.Apartment)
 def create_apartment(
     apartment_data: schemas.ApartmentCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     apartment = models.Apartment(**apartment_data.model_dump())
     db.add(apartment)
@@ -39,7 +56,7 @@ def update_apartment(
     apartment_id: int,
     apartment_data: schemas.ApartmentUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     apartment = db.query(models.Apartment).filter(models.Apartment.id == apartment_id).first()
     if not apartment:
@@ -57,12 +74,13 @@ def update_apartment(
 def delete_apartment(
     apartment_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     apartment = db.query(models.Apartment).filter(models.Apartment.id == apartment_id).first()
     if not apartment:
         raise HTTPException(status_code=404, detail="Apartment not found")
     
+    delete_daily_stats(db, apartment_ids=[apartment_id])
     db.delete(apartment)
     db.commit()
     return {"message": "Apartment deleted successfully"}
@@ -1,23 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .. import models, schemas, auth
-from ..database import get_db
+from .. import models, schemas, auth, passwords
+from ..database import get_db, get_async_db
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == request.email).first()
+async def login(request: schemas.LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.User).where(models.User.email == request.email))
+    user = result.scalars().first()
     
-    if not user or not auth.verify_password(request.password, user.hashed_password):
+    # La verifica gira nel pool dedicato: l'event loop resta libero durante i picchi di login
+    valid, new_hash = await passwords.verify_and_update_async(
+        request.password, user.hashed_password if user else None
+    )
+    if not user or not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = auth.create_access_token(data={"sub": user.email})
+    # Hash SHA-256 delle versioni precedenti (o costo cambiato): si aggiorna ora che la password è nota
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
+    access_token = auth.create_user_token(user)
     
     return {
         "token": access_token,
@@ -26,24 +38,36 @@ def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=schemas.User)
-def get_current_user(current_user: models.User = Depends(auth.get_current_user)):
+async def get_current_user(current_user: auth.UserProfile = Depends(auth.get_user_profile_async)):
     return current_user
 
 
-@router.put("/me", response_model=schemas.User)
+@router.put("/me", response_model=schemas.CurrentUserUpdated)
 def update_current_user(
     user_update: schemas.UserUpdate,
-    current_user: models.User = Depends(auth.get_current_user),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
-    if user_update.email is not None:
-        current_user.email = user_update.email
+    user = db.query(models.User).filter(models.User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="Utente non trovato")
+    
+    previous_email = user.email
+    if user_update.email is not None and user_update.email != user.email:
+        user.email = user_update.email
+        # L'email è il soggetto del token: quelli emessi finora vanno revocati
+        user.token_version += 1
     if user_update.name is not None:
-        current_user.name = user_update.name
-    if user_update.role is not None:
-        current_user.role = user_update.role
+        user.name = user_update.name
+    if user_update.role is not None and user_update.role != user.role:
+        user.role = user_update.role
+        # Il ruolo è nel token: quelli emessi finora vanno revocati
+        user.token_version += 1
     
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    db.refresh(user)
+    auth.user_changed(user, previous_email)
+    
+    # Token nuovo con la versione aggiornata: quello usato per questa richiesta potrebbe essere revocato
+    return {**schemas.User.model_validate(user).model_dump(), "token": auth.create_user_token(user)}
 
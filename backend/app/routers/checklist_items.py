@@ -1,34 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from .. import models, schemas, auth
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
+from typing import Dict, List, Optional
+from .. import models, schemas, auth, cache, response_cache
+from ..database import get_db, get_read_db, get_async_read_db
+from ..utils import dump_json, json_bytes_response, parse_id_list
 
 router = APIRouter(prefix="/checklist-items", tags=["checklist-items"])
 
+# Namespace del catalogo nella cache delle risposte (nome della tabella)
+CATALOG = "checklist_items"
+
 
 # ============ CHECKLIST GLOBALI ============
 
 @router.get("", response_model=List[schemas.ChecklistItem])
 def get_checklist_items(
+    request: Request,
     room_name: Optional[str] = Query(None),
+    # Database principale, non la replica: una replica in ritardo salverebbe in cache
+    # i dati precedenti alla modifica sotto la generazione nuova
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
-    """Ottieni tutte le checklist globali"""
-    query = db.query(models.ChecklistItem)
-    
-    if room_name is not None:
-        query = query.filter(models.ChecklistItem.room_name == room_name)
+    """Ottieni tutte le checklist globali (dalla cache del catalogo, con ETag)"""
+    def load() -> bytes:
+        query = db.query(models.ChecklistItem)
+        
+        if room_name is not None:
+            query = query.filter(models.ChecklistItem.room_name == room_name)
+        
+        items = query.order_by(models.ChecklistItem.order, models.ChecklistItem.title).all()
+        return dump_json(schemas.ChecklistItemList, items)
     
-    return query.order_by(models.ChecklistItem.order, models.ChecklistItem.title).all()
+    return response_cache.cached_json(request, CATALOG, room_name, load)
 
 
 @router.get("/{checklist_item_id}", response_model=schemas.ChecklistItem)
 def get_checklist_item(
     checklist_item_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     """Ottieni una checklist specifica"""
     item = db.query(models.ChecklistItem).filter(
@@ -45,13 +59,14 @@ def get_checklist_item(
 def create_checklist_item(
     item_data: schemas.ChecklistItemCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Crea una nuova checklist globale"""
     item = models.ChecklistItem(**item_data.model_dump())
     db.add(item)
     db.commit()
     db.refresh(item)
+    cache.publish(CATALOG, item.id)
     return item
 
 
@@ -60,7 +75,7 @@ def update_checklist_item(
     checklist_item_id: int,
     item_data: schemas.ChecklistItemUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Aggiorna una checklist globale"""
     item = db.query(models.ChecklistItem).filter(
@@ -75,6 +90,7 @@ def update_checklist_item(
     
     db.commit()
     db.refresh(item)
+    cache.publish(CATALOG, item.id)
     return item
 
 
@@ -82,7 +98,7 @@ def update_checklist_item(
 def delete_checklist_item(
     checklist_item_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Elimina una checklist globale"""
     item = db.query(models.ChecklistItem).filter(
@@ -94,36 +110,57 @@ def delete_checklist_item(
     
     db.delete(item)
     db.commit()
+    cache.publish(CATALOG, checklist_item_id)
     return {"message": "Checklist item deleted successfully"}
 
 
 # ============ APARTMENT CHECKLIST ITEMS (ASSEGNAZIONI) ============
 
+async def _load_apartment_checklist_items(db: AsyncSession, apartment_ids: List[int]):
+    """Carica le assegnazioni con i dettagli della checklist in un'unica query con join"""
+    result = await db.execute(
+        select(models.ApartmentChecklistItem).join(
+            models.ApartmentChecklistItem.checklist_item
+        ).options(
+            contains_eager(models.ApartmentChecklistItem.checklist_item)
+        ).where(
+            models.ApartmentChecklistItem.apartment_id.in_(apartment_ids)
+        ).order_by(
+            models.ApartmentChecklistItem.apartment_id,
+            models.ApartmentChecklistItem.order,
+            models.ApartmentChecklistItem.id
+        )
+    )
+    return result.scalars().all()
+
+
+@router.get("/apartments/checklist-items", response_model=Dict[int, List[schemas.ApartmentChecklistItemWithDetails]])
+async def get_apartments_checklist_items(
+    apartment_ids: str = Query(..., description="Id degli appartamenti separati da virgola (es: 1,2,3)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user_async)
+):
+    """Ottieni le checklist assegnate a più appartamenti, raggruppate per appartamento"""
+    ids = parse_id_list(apartment_ids)
+    
+    result = {apartment_id: [] for apartment_id in ids}
+    for apt_item in await _load_apartment_checklist_items(db, ids):
+        result[apt_item.apartment_id].append(apt_item)
+    
+    return json_bytes_response(dump_json(schemas.ApartmentChecklistItemsByApartment, result))
+
+
 @router.get("/apartment/{apartment_id}/checklist-items", response_model=List[schemas.ApartmentChecklistItemWithDetails])
-def get_apartment_checklist_items(
+async def get_apartment_checklist_items(
     apartment_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user_async)
 ):
     """Ottieni tutte le checklist assegnate a un appartamento"""
-    apartment_items = db.query(models.ApartmentChecklistItem).filter(
-        models.ApartmentChecklistItem.apartment_id == apartment_id
-    ).all()
-    
-    # Popola i dettagli delle checklist
-    result = []
-    for apt_item in apartment_items:
-        checklist_item = db.query(models.ChecklistItem).filter(
-            models.ChecklistItem.id == apt_item.checklist_item_id
-        ).first()
-        
-        if checklist_item:
-            result.append({
-                **apt_item.__dict__,
-                "checklist_item": checklist_item
-            })
-    
-    return result
+    return json_bytes_response(dump_json(
+        schemas.ApartmentChecklistItemWithDetailsList,
+        await _load_apartment_checklist_items(db, [apartment_id])
+    ))
 
 
 @router.post("/apartment/{apartment_id}/checklist-items", response_model=schemas.ApartmentChecklistItem)
@@ -131,7 +168,7 @@ def add_checklist_to_apartment(
     apartment_id: int,
     data: schemas.ApartmentChecklistItemCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Assegna una checklist globale a un appartamento"""
     # Verifica che l'appartamento esista
@@ -146,22 +183,17 @@ def add_checklist_to_apartment(
     if not checklist:
         raise HTTPException(status_code=404, detail="Checklist item not found")
     
-    # Verifica che non sia già assegnata
-    existing = db.query(models.ApartmentChecklistItem).filter(
-        models.ApartmentChecklistItem.apartment_id == apartment_id,
-        models.ApartmentChecklistItem.checklist_item_id == data.checklist_item_id
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Checklist already assigned to this apartment")
-    
-    # Crea l'assegnazione
+    # Crea l'assegnazione: i duplicati sono bloccati dall'indice univoco
     apartment_checklist = models.ApartmentChecklistItem(
         apartment_id=apartment_id,
         checklist_item_id=data.checklist_item_id
     )
     db.add(apartment_checklist)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Checklist already assigned to this apartment")
     db.refresh(apartment_checklist)
     return apartment_checklist
 
@@ -171,7 +203,7 @@ def update_apartment_checklist_item(
     apartment_checklist_item_id: int,
     data: schemas.ApartmentChecklistItemUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Aggiorna una checklist assegnata a un appartamento (es: ordine)"""
     apartment_checklist = db.query(models.ApartmentChecklistItem).filter(
@@ -193,7 +225,7 @@ def update_apartment_checklist_item(
 def remove_checklist_from_apartment(
     apartment_checklist_item_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Rimuovi un'assegnazione checklist da un appartamento"""
     apartment_checklist = db.query(models.ApartmentChecklistItem).filter(
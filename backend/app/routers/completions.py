@@ -1,77 +1,232 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from .. import models, schemas, auth
-from ..database import get_db
+from ..database import get_db, get_async_db
+from ..utils import dump_rows_json, finish_keyset_page, json_bytes_response, keyset_queries, parse_fields, partial_list_adapter
+from ..stats import record_completions
 
 router = APIRouter(prefix="/completions", tags=["completions"])
 
+# Campo dello schema ChecklistCompletion -> colonna della query di GET /completions
+_COMPLETION_COLUMNS = {
+    "id": models.ChecklistCompletion.id,
+    "checklist_item_id": models.ChecklistCompletion.checklist_item_id,
+    "user_id": models.ChecklistCompletion.user_id,
+    "work_session_id": models.ChecklistCompletion.work_session_id,
+    "completed_at": models.ChecklistCompletion.completed_at,
+    "notes": models.ChecklistCompletion.notes,
+    "value_number": models.ChecklistCompletion.value_number,
+    "value_bool": models.ChecklistCompletion.value_bool,
+    "apartment_id": models.ChecklistCompletion.apartment_id,
+    "checklist_item_title": models.ChecklistItem.title.label("checklist_item_title"),
+}
+_CURSOR_COLUMNS = {name: _COMPLETION_COLUMNS[name] for name in ("completed_at", "id")}
 
-@router.get("")
-def get_completions(
+
+@router.get("", response_model=List[schemas.ChecklistCompletion])
+async def get_completions(
     checklist_item_id: Optional[int] = Query(None),
     user_id: Optional[int] = Query(None),
     work_session_id: Optional[int] = Query(None),
-    limit: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    apartment_id: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, description="Valore di X-Next-Cursor della pagina precedente"),
+    fields: Optional[str] = Query(None, description="Campi da restituire separati da virgola (es: id,completed_at)"),
+    response: Response = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user_async)
 ):
-    query = db.query(models.ChecklistCompletion).join(models.ChecklistItem)
+    selected = parse_fields(fields, schemas.ChecklistCompletion)
+    names = selected or tuple(_COMPLETION_COLUMNS)
+    
+    # Solo le colonne necessarie alla risposta: righe semplici, nessun oggetto ORM
+    # e nessun lazy-load di checklist_item. id e completed_at servono sempre per il cursore
+    columns = [_COMPLETION_COLUMNS[name] for name in names]
+    columns += [column for name, column in _CURSOR_COLUMNS.items() if name not in names]
+    query = select(*columns).select_from(models.ChecklistCompletion)
+    
+    if "checklist_item_title" in names:
+        query = query.join(
+            models.ChecklistItem,
+            models.ChecklistItem.id == models.ChecklistCompletion.checklist_item_id
+        )
     
     if checklist_item_id is not None:
-        query = query.filter(models.ChecklistCompletion.checklist_item_id == checklist_item_id)
+        query = query.where(models.ChecklistCompletion.checklist_item_id == checklist_item_id)
     
     if user_id is not None:
-        query = query.filter(models.ChecklistCompletion.user_id == user_id)
+        query = query.where(models.ChecklistCompletion.user_id == user_id)
     
     if work_session_id is not None:
-        query = query.filter(models.ChecklistCompletion.work_session_id == work_session_id)
+        query = query.where(models.ChecklistCompletion.work_session_id == work_session_id)
     
-    completions = query.order_by(models.ChecklistCompletion.completed_at.desc())
+    if apartment_id is not None:
+        query = query.where(models.ChecklistCompletion.apartment_id == apartment_id)
     
-    if limit is not None:
-        completions = completions.limit(limit)
+    rows = []
+    for page_query in keyset_queries(
+        query,
+        models.ChecklistCompletion.completed_at,
+        models.ChecklistCompletion.id,
+        cursor,
+        limit
+    ):
+        rows += (await db.execute(page_query)).all()
+        if limit is not None and len(rows) > limit:
+            break
+    rows = finish_keyset_page(
+        rows,
+        models.ChecklistCompletion.completed_at,
+        models.ChecklistCompletion.id,
+        limit,
+        response
+    )
     
-    # Restituisci i dati con work_session_id
-    results = []
-    for completion in completions.all():
-        # Ottieni apartment_id tramite work_session
-        apartment_id = None
-        if completion.work_session:
-            apartment_id = completion.work_session.apartment_id
-        
-        results.append({
-            "id": completion.id,
-            "checklist_item_id": completion.checklist_item_id,
-            "user_id": completion.user_id,
-            "work_session_id": completion.work_session_id,
-            "completed_at": completion.completed_at.isoformat() if completion.completed_at else None,
-            "notes": completion.notes,
-            "apartment_id": apartment_id,
-            "checklist_item_title": completion.checklist_item.title if completion.checklist_item else None
-        })
-    
-    return results
+    # Le colonne hanno gli stessi nomi dei campi dello schema
+    adapter = schemas.ChecklistCompletionList if selected is None \
+        else partial_list_adapter(schemas.ChecklistCompletion, selected)
+    return json_bytes_response(dump_rows_json(adapter, rows), response)
 
 
 @router.post("", response_model=schemas.ChecklistCompletion)
 def create_completion(
     completion_data: schemas.ChecklistCompletionCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     completion = models.ChecklistCompletion(**completion_data.model_dump())
+    
+    if db.query(models.ChecklistItem.id).filter(models.ChecklistItem.id == completion.checklist_item_id).first() is None:
+        raise HTTPException(status_code=404, detail="Checklist item not found")
+    
+    # apartment_id viene copiato dalla work session
+    if completion.work_session_id is not None:
+        session = db.query(models.WorkSession.apartment_id).filter(
+            models.WorkSession.id == completion.work_session_id
+        ).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Work session non trovata")
+        completion.apartment_id = session.apartment_id
+    
     db.add(completion)
+    record_completions(db, [completion])
     db.commit()
     db.refresh(completion)
     return completion
 
 
+def apply_completion_operations(
+    db: Session,
+    session: models.WorkSession,
+    operations: List[schemas.ChecklistCompletionOperation],
+    user_id: int
+):
+    """Applica upsert e cancellazioni alla sessione senza fare commit (lo fa il chiamante)"""
+    # Le checklist vanno verificate prima di scrivere: una chiave esterna violata sarebbe un 500
+    item_ids = {op.checklist_item_id for op in operations if op.op == 'upsert'}
+    if item_ids:
+        found = {
+            row.id for row in db.query(models.ChecklistItem.id).filter(models.ChecklistItem.id.in_(item_ids))
+        }
+        if found != item_ids:
+            raise HTTPException(status_code=404, detail="Checklist item not found")
+    
+    # Registra le chiavi nella stessa transazione dei completamenti (un batch fallito non le lascia
+    # salvate). Le chiavi in conflitto sono già state applicate da una richiesta precedente o
+    # concorrente: RETURNING restituisce solo quelle inserite ora
+    keys = list(dict.fromkeys(op.idempotency_key for op in operations if op.idempotency_key))
+    new_keys = set()
+    if keys:
+        table = models.CompletionIdempotencyKey.__table__
+        dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        statement = dialect_insert(table).values([
+            {"work_session_id": session.id, "key": key} for key in keys
+        ]).on_conflict_do_nothing(index_elements=["work_session_id", "key"]).returning(table.c.key)
+        new_keys = set(db.execute(statement).scalars())
+    
+    # Stato attuale della sessione, caricato una sola volta
+    created = []
+    deleted = []
+    existing = {}
+    for completion in db.query(models.ChecklistCompletion).filter(
+        models.ChecklistCompletion.work_session_id == session.id
+    ):
+        existing.setdefault(completion.checklist_item_id, []).append(completion)
+    
+    for operation in operations:
+        if operation.idempotency_key:
+            # Già applicata, oppure ripetuta nella stessa richiesta
+            if operation.idempotency_key not in new_keys:
+                continue
+            new_keys.discard(operation.idempotency_key)
+        
+        current = existing.get(operation.checklist_item_id, [])
+        
+        if operation.op == 'delete':
+            for completion in current:
+                if completion in created:
+                    # Creato in questo stesso batch: basta non inserirlo
+                    created.remove(completion)
+                    db.expunge(completion)
+                else:
+                    db.delete(completion)
+                    deleted.append(completion)
+            existing[operation.checklist_item_id] = []
+        elif current:
+            completion = current[0]
+            completion.notes = operation.notes
+            completion.value_number = operation.value_number
+            completion.value_bool = operation.value_bool
+        else:
+            completion = models.ChecklistCompletion(
+                checklist_item_id=operation.checklist_item_id,
+                user_id=user_id,
+                work_session_id=session.id,
+                apartment_id=session.apartment_id,
+                notes=operation.notes,
+                value_number=operation.value_number,
+                value_bool=operation.value_bool
+            )
+            db.add(completion)
+            created.append(completion)
+            existing[operation.checklist_item_id] = [completion]
+    
+    record_completions(db, created)
+    record_completions(db, deleted, -1)
+
+
+@router.post("/batch", response_model=List[schemas.ChecklistCompletion])
+def apply_completions_batch(
+    batch: schemas.ChecklistCompletionBatch,
+    db: Session = Depends(get_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
+):
+    """Applica upsert e cancellazioni di completamenti per una work session in un'unica transazione"""
+    session = db.query(models.WorkSession).filter(models.WorkSession.id == batch.work_session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Work session non trovata")
+    
+    if current_user.role != 'admin' and session.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Non autorizzato")
+    
+    apply_completion_operations(db, session, batch.operations, current_user.id)
+    db.commit()
+    
+    # Restituisce lo stato finale della sessione con una sola query
+    return db.query(models.ChecklistCompletion).filter(
+        models.ChecklistCompletion.work_session_id == batch.work_session_id
+    ).order_by(models.ChecklistCompletion.completed_at).all()
+
+
 @router.delete("/{completion_id}")
 def delete_completion(
     completion_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     completion = db.query(models.ChecklistCompletion).filter(
         models.ChecklistCompletion.id == completion_id
@@ -79,6 +234,7 @@ def delete_completion(
     if not completion:
         raise HTTPException(status_code=404, detail="Completion not found")
     
+    record_completions(db, [completion], -1)
     db.delete(completion)
     db.commit()
     return {"message": "Completion deleted successfully"}
@@ -0,0 +1,159 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+from .. import models, schemas, auth
+from ..database import get_read_db
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("/summary", response_model=schemas.DashboardSummary)
+def get_dashboard_summary(
+    property_id: Optional[int] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
+):
+    """Riepilogo per appartamento calcolato lato server con query GROUP BY"""
+    apartments_query = db.query(
+        models.Apartment.id,
+        models.Apartment.name,
+        models.Apartment.property_id
+    )
+    if property_id is not None:
+        apartments_query = apartments_query.filter(models.Apartment.property_id == property_id)
+    apartments = apartments_query.order_by(models.Apartment.id).all()
+
+    # Sottoquery usata per limitare le aggregazioni alla proprietà selezionata
+    scoped_ids = db.query(models.Apartment.id)
+    if property_id is not None:
+        scoped_ids = scoped_ids.filter(models.Apartment.property_id == property_id)
+    scoped_ids = scoped_ids.scalar_subquery()
+
+    # Checklist assegnate per appartamento
+    assigned = dict(db.query(
+        models.ApartmentChecklistItem.apartment_id,
+        func.count(models.ApartmentChecklistItem.id)
+    ).filter(
+        models.ApartmentChecklistItem.apartment_id.in_(scoped_ids)
+    ).group_by(models.ApartmentChecklistItem.apartment_id).all())
+
+    # Completamenti totali e ultima pulizia per appartamento
+    completion_stats = {
+        row.apartment_id: row
+        for row in db.query(
+            models.ChecklistCompletion.apartment_id,
+            func.count(models.ChecklistCompletion.id).label("completions_count"),
+            func.max(models.ChecklistCompletion.completed_at).label("last_cleaned_at")
+        ).filter(
+            models.ChecklistCompletion.apartment_id.in_(scoped_ids)
+        ).group_by(models.ChecklistCompletion.apartment_id).all()
+    }
+
+    # Checklist completate nell'ultima work session di ogni appartamento
+    latest_sessions = db.query(
+        func.max(models.WorkSession.id)
+    ).filter(
+        models.WorkSession.apartment_id.in_(scoped_ids)
+    ).group_by(models.WorkSession.apartment_id).scalar_subquery()
+
+    completed = dict(db.query(
+        models.WorkSession.apartment_id,
+        func.count(func.distinct(models.ChecklistCompletion.checklist_item_id))
+    ).join(
+        models.ChecklistCompletion,
+        models.ChecklistCompletion.work_session_id == models.WorkSession.id
+    ).filter(
+        models.WorkSession.id.in_(latest_sessions)
+    ).group_by(models.WorkSession.apartment_id).all())
+
+    # Work session ancora aperte
+    active = dict(db.query(
+        models.WorkSession.apartment_id,
+        func.count(models.WorkSession.id)
+    ).filter(
+        models.WorkSession.end_time.is_(None),
+        models.WorkSession.apartment_id.in_(scoped_ids)
+    ).group_by(models.WorkSession.apartment_id).all())
+
+    # Alert aperti sulle scorte assegnate a ciascun appartamento
+    alerts = dict(db.query(
+        models.ApartmentSupply.apartment_id,
+        func.count(func.distinct(models.SupplyAlert.id))
+    ).join(
+        models.SupplyAlert,
+        models.SupplyAlert.supply_id == models.ApartmentSupply.supply_id
+    ).filter(
+        models.SupplyAlert.is_resolved == False,
+        models.ApartmentSupply.apartment_id.in_(scoped_ids)
+    ).group_by(models.ApartmentSupply.apartment_id).all())
+
+    # Totale degli alert aperti sulle scorte assegnate agli appartamenti considerati (ognuno contato una volta)
+    scoped_supplies = db.query(models.ApartmentSupply.supply_id).filter(
+        models.ApartmentSupply.apartment_id.in_(scoped_ids)
+    ).scalar_subquery()
+    open_alerts = db.query(func.count(models.SupplyAlert.id)).filter(
+        models.SupplyAlert.is_resolved == False,
+        models.SupplyAlert.supply_id.in_(scoped_supplies)
+    ).scalar()
+
+    summaries = []
+    for apartment in apartments:
+        stats = completion_stats.get(apartment.id)
+        summaries.append(schemas.ApartmentSummary(
+            apartment_id=apartment.id,
+            apartment_name=apartment.name,
+            property_id=apartment.property_id,
+            assigned_items=assigned.get(apartment.id, 0),
+            completed_items=completed.get(apartment.id, 0),
+            completions_count=stats.completions_count if stats else 0,
+            open_alerts=alerts.get(apartment.id, 0),
+            active_sessions=active.get(apartment.id, 0),
+            last_cleaned_at=stats.last_cleaned_at if stats else None
+        ))
+
+    return schemas.DashboardSummary(
+        total_apartments=len(apartments),
+        open_alerts=open_alerts,
+        active_sessions=sum(active.values()),
+        apartments=summaries
+    )
+
+
+@router.get("/daily-stats", response_model=List[schemas.ApartmentDailyStats])
+def get_daily_stats(
+    apartment_id: Optional[int] = Query(None),
+    property_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
+):
+    """Riepilogo giornaliero per appartamento e operatore (legge la tabella di rollup)"""
+    query = db.query(models.ApartmentDailyStats)
+    
+    if apartment_id is not None:
+        query = query.filter(models.ApartmentDailyStats.apartment_id == apartment_id)
+    
+    if property_id is not None:
+        query = query.join(
+            models.Apartment,
+            models.Apartment.id == models.ApartmentDailyStats.apartment_id
+        ).filter(models.Apartment.property_id == property_id)
+    
+    if user_id is not None:
+        query = query.filter(models.ApartmentDailyStats.user_id == user_id)
+    
+    if date_from is not None:
+        query = query.filter(models.ApartmentDailyStats.day >= date_from)
+    
+    if date_to is not None:
+        query = query.filter(models.ApartmentDailyStats.day <= date_to)
+    
+    return query.order_by(
+        models.ApartmentDailyStats.day.desc(),
+        models.ApartmentDailyStats.apartment_id,
+        models.ApartmentDailyStats.user_id
+    ).all()
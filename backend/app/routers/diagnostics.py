@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List
+from .. import schemas, auth
+from ..slow_queries import slow_query_log
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/slow-queries", response_model=List[schemas.SlowQuery])
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
+):
+    """Query lente registrate da questo processo, ordinate per tempo totale"""
+    return slow_query_log.entries()[:limit]
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries(
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
+):
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from .. import models, schemas, auth
+from .. import schemas, auth
 from ..database import get_db
 from ..config import settings
 import smtplib
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/email", tags=["email"])
 def send_email(
     email_data: schemas.EmailSend,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     if not settings.SMTP_HOST or not settings.SMTP_USER:
         return {"message": "Email service not configured"}
@@ -0,0 +1,147 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from datetime import datetime
+from typing import Optional
+from .. import models, auth
+from ..database import ReadSessionLocal
+import csv
+import io
+import json
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# Righe caricate dal database per ogni blocco dello stream
+YIELD_PER = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _stream_rows(statement, format: str):
+    """
+    Esegue la query a blocchi (yield_per) e produce NDJSON o CSV riga per riga.
+    La sessione viene aperta qui perché lo stream continua dopo la chiusura di get_db.
+    """
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=YIELD_PER)).mappings()
+        columns = list(result.keys())
+
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for partition in result.partitions():
+                for row in partition:
+                    writer.writerow([_serialize(row[column]) for column in columns])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            yield buffer.getvalue()
+        else:
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps({column: _serialize(row[column]) for column in columns}) + "\n"
+                    for row in partition
+                )
+    finally:
+        db.close()
+
+
+def _export_response(statement, format: str, name: str):
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format must be 'ndjson' or 'csv'")
+
+    filename = f"{name}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{format}"
+    return StreamingResponse(
+        _stream_rows(statement, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/completions")
+def export_completions(
+    format: str = Query("ndjson"),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    property_id: Optional[int] = Query(None),
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
+):
+    """Esporta in streaming i completamenti delle checklist (NDJSON o CSV)"""
+    statement = select(
+        models.ChecklistCompletion.id,
+        models.ChecklistCompletion.completed_at,
+        models.Apartment.property_id,
+        models.ChecklistCompletion.apartment_id,
+        models.ChecklistCompletion.work_session_id,
+        models.ChecklistCompletion.user_id,
+        models.ChecklistCompletion.checklist_item_id,
+        models.ChecklistItem.title.label("checklist_item_title"),
+        models.ChecklistCompletion.value_number,
+        models.ChecklistCompletion.value_bool,
+        models.ChecklistCompletion.notes
+    ).join(
+        models.ChecklistItem,
+        models.ChecklistItem.id == models.ChecklistCompletion.checklist_item_id
+    ).outerjoin(
+        models.Apartment,
+        models.Apartment.id == models.ChecklistCompletion.apartment_id
+    )
+
+    if date_from is not None:
+        statement = statement.where(models.ChecklistCompletion.completed_at >= date_from)
+    if date_to is not None:
+        statement = statement.where(models.ChecklistCompletion.completed_at < date_to)
+    if property_id is not None:
+        statement = statement.where(models.Apartment.property_id == property_id)
+
+    statement = statement.order_by(models.ChecklistCompletion.completed_at, models.ChecklistCompletion.id)
+    return _export_response(statement, format, "completions")
+
+
+@router.get("/work-sessions")
+def export_work_sessions(
+    format: str = Query("ndjson"),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    property_id: Optional[int] = Query(None),
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
+):
+    """Esporta in streaming le work session (NDJSON o CSV)"""
+    statement = select(
+        models.WorkSession.id,
+        models.WorkSession.start_time,
+        models.WorkSession.end_time,
+        models.Apartment.property_id,
+        models.WorkSession.apartment_id,
+        models.Apartment.name.label("apartment_name"),
+        models.WorkSession.user_id,
+        models.User.name.label("user_name"),
+        models.WorkSession.notes
+    ).join(
+        models.Apartment,
+        models.Apartment.id == models.WorkSession.apartment_id
+    ).join(
+        models.User,
+        models.User.id == models.WorkSession.user_id
+    )
+
+    if date_from is not None:
+        statement = statement.where(models.WorkSession.start_time >= date_from)
+    if date_to is not None:
+        statement = statement.where(models.WorkSession.start_time < date_to)
+    if property_id is not None:
+        statement = statement.where(models.Apartment.property_id == property_id)
+
+    statement = statement.order_by(models.WorkSession.start_time, models.WorkSession.id)
+    return _export_response(statement, format, "work_sessions")
@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from .. import models, schemas, auth
-from ..database import get_db
+from .. import models, schemas, auth, response_cache
+from ..database import get_db, get_read_db
+from ..stats import delete_daily_stats
 
 router = APIRouter(prefix="/properties", tags=["properties"])
 
 
 @router.get("", response_model=List[schemas.Property])
 def get_properties(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user),
+    not_modified: None = Depends(response_cache.conditional_get("properties"))
 ):
     return db.query(models.Property).all()
 
@@ -19,7 +21,7 @@ def get_properties(
 def create_property(
     property_data: schemas.PropertyCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     property_obj = models.Property(**property_data.model_dump())
     db.add(property_obj)
@@ -33,7 +35,7 @@ def update_property(
     property_id: int,
     property_data: schemas.PropertyUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     property_obj = db.query(models.Property).filter(models.Property.id == property_id).first()
     if not property_obj:
@@ -51,12 +53,14 @@ def update_property(
 def delete_property(
     property_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     property_obj = db.query(models.Property).filter(models.Property.id == property_id).first()
     if not property_obj:
         raise HTTPException(status_code=404, detail="Property not found")
     
+    # Gli appartamenti vengono eliminati in cascata insieme alla proprietà
+    delete_daily_stats(db, apartment_ids=[apartment.id for apartment in property_obj.apartments])
     db.delete(property_obj)
     db.commit()
     return {"message": "Property deleted successfully"}
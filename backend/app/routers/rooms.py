@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from .. import models, schemas, auth
-from ..database import get_db
+from .. import models, schemas, auth, response_cache
+from ..database import get_db, get_read_db
 
 router = APIRouter(prefix="/rooms", tags=["rooms"])
 
@@ -10,8 +10,9 @@ router = APIRouter(prefix="/rooms", tags=["rooms"])
 @router.get("", response_model=List[schemas.Room])
 def get_rooms(
     apartment_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user),
+    not_modified: None = Depends(response_cache.conditional_get("rooms"))
 ):
     query = db.query(models.Room)
     
@@ -25,7 +26,7 @@ def get_rooms(
 def create_room(
     room_data: schemas.RoomCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     room = models.Room(**room_data.model_dump())
     db.add(room)
@@ -38,7 +39,7 @@ def create_room(
 def delete_room(
     room_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     room = db.query(models.Room).filter(models.Room.id == room_id).first()
     if not room:
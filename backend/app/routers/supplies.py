@@ -1,35 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager
+from typing import Dict, List, Optional
 from datetime import datetime
-from .. import models, schemas, auth
-from ..database import get_db
+from .. import models, schemas, auth, cache, response_cache
+from ..database import get_db, get_read_db
+from ..utils import dump_json, dump_rows_json, json_bytes_response, parse_fields, parse_id_list, partial_list_adapter
 
 router = APIRouter(prefix="/supplies", tags=["supplies"])
 
+# Namespace del catalogo nella cache delle risposte (nome della tabella)
+CATALOG = "supplies"
+
 
 # ========== SCORTE GLOBALI ==========
 
 @router.get("", response_model=List[schemas.Supply])
 def get_supplies(
+    request: Request,
     category: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Campi da restituire separati da virgola (es: id,name)"),
+    # Database principale, non la replica: una replica in ritardo salverebbe in cache
+    # i dati precedenti alla modifica sotto la generazione nuova
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
-    """Ottieni tutte le scorte globali"""
-    query = db.query(models.Supply)
-    
-    if category is not None:
-        query = query.filter(models.Supply.category == category)
-    
-    return query.all()
+    """Ottieni tutte le scorte globali (dalla cache del catalogo, con ETag)"""
+    selected = parse_fields(fields, schemas.Supply)
+    
+    def load() -> bytes:
+        if selected is None:
+            query = db.query(models.Supply)
+        else:
+            query = db.query(*(getattr(models.Supply, name) for name in selected))
+        
+        if category is not None:
+            query = query.filter(models.Supply.category == category)
+        
+        if selected is None:
+            return dump_json(schemas.SupplyList, query.all())
+        return dump_rows_json(partial_list_adapter(schemas.Supply, selected), query.all())
+    
+    # Una voce in cache per ogni combinazione di filtro e campi
+    return response_cache.cached_json(request, CATALOG, (category, selected), load)
 
 
 @router.get("/{supply_id}", response_model=schemas.Supply)
 def get_supply(
     supply_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     """Ottieni una scorta globale specifica"""
     supply = db.query(models.Supply).filter(models.Supply.id == supply_id).first()
@@ -42,13 +62,14 @@ def get_supply(
 def create_supply(
     supply_data: schemas.SupplyCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Crea una nuova scorta globale"""
     supply = models.Supply(**supply_data.model_dump())
     db.add(supply)
     db.commit()
     db.refresh(supply)
+    cache.publish(CATALOG, supply.id)
     return supply
 
 
@@ -57,7 +78,7 @@ def update_supply(
     supply_id: int,
     supply_data: schemas.SupplyUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Aggiorna una scorta globale"""
     supply = db.query(models.Supply).filter(models.Supply.id == supply_id).first()
@@ -69,6 +90,7 @@ def update_supply(
     
     db.commit()
     db.refresh(supply)
+    cache.publish(CATALOG, supply.id)
     return supply
 
 
@@ -76,7 +98,7 @@ def update_supply(
 def delete_supply(
     supply_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Elimina una scorta globale"""
     supply = db.query(models.Supply).filter(models.Supply.id == supply_id).first()
@@ -85,36 +107,73 @@ def delete_supply(
     
     db.delete(supply)
     db.commit()
+    cache.publish(CATALOG, supply_id)
     return {"message": "Supply deleted successfully"}
 
 
 # ========== ASSEGNAZIONI APPARTAMENTO-SCORTE ==========
 
+def _apartment_supplies_query(db: Session):
+    """Query delle assegnazioni con i dettagli della scorta caricati tramite join"""
+    return db.query(models.ApartmentSupply).join(
+        models.ApartmentSupply.supply
+    ).options(
+        contains_eager(models.ApartmentSupply.supply)
+    ).order_by(
+        models.ApartmentSupply.apartment_id,
+        models.ApartmentSupply.id
+    )
+
+
+@router.get("/apartments/supplies", response_model=Dict[int, List[schemas.ApartmentSupplyWithDetails]])
+def get_apartments_supplies(
+    apartment_ids: Optional[str] = Query(None, description="Id degli appartamenti separati da virgola (es: 1,2,3)"),
+    property_id: Optional[int] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
+):
+    """Ottieni le scorte assegnate a più appartamenti, raggruppate per appartamento"""
+    if apartment_ids is None and property_id is None:
+        raise HTTPException(status_code=400, detail="Specify apartment_ids or property_id")
+    
+    query = _apartment_supplies_query(db)
+    
+    if apartment_ids is not None:
+        ids = parse_id_list(apartment_ids)
+        query = query.filter(models.ApartmentSupply.apartment_id.in_(ids))
+    else:
+        ids = [row.id for row in db.query(models.Apartment.id).filter(
+            models.Apartment.property_id == property_id
+        ).order_by(models.Apartment.id)]
+        query = query.join(models.ApartmentSupply.apartment).filter(
+            models.Apartment.property_id == property_id
+        )
+    
+    result = {apartment_id: [] for apartment_id in ids}
+    for apt_supply in query.all():
+        result.setdefault(apt_supply.apartment_id, []).append(apt_supply)
+    
+    return json_bytes_response(dump_json(schemas.ApartmentSuppliesByApartment, result))
+
+
 @router.get("/apartment/{apartment_id}/supplies", response_model=List[schemas.ApartmentSupplyWithDetails])
 def get_apartment_supplies(
     apartment_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     """Ottieni tutte le scorte assegnate a un appartamento"""
-    apartment = db.query(models.Apartment).filter(models.Apartment.id == apartment_id).first()
-    if not apartment:
-        raise HTTPException(status_code=404, detail="Apartment not found")
-    
-    apartment_supplies = db.query(models.ApartmentSupply).filter(
+    apartment_supplies = _apartment_supplies_query(db).filter(
         models.ApartmentSupply.apartment_id == apartment_id
     ).all()
     
-    # Carica i dettagli delle scorte
-    result = []
-    for apt_supply in apartment_supplies:
-        supply = db.query(models.Supply).filter(models.Supply.id == apt_supply.supply_id).first()
-        result.append({
-            **apt_supply.__dict__,
-            "supply": supply
-        })
+    # La verifica dell'appartamento serve solo se non ci sono assegnazioni
+    if not apartment_supplies:
+        apartment = db.query(models.Apartment.id).filter(models.Apartment.id == apartment_id).first()
+        if not apartment:
+            raise HTTPException(status_code=404, detail="Apartment not found")
     
-    return result
+    return json_bytes_response(dump_json(schemas.ApartmentSupplyWithDetailsList, apartment_supplies))
 
 
 @router.post("/apartment/{apartment_id}/supplies", response_model=schemas.ApartmentSupply)
@@ -122,7 +181,7 @@ def add_supply_to_apartment(
     apartment_id: int,
     data: schemas.ApartmentSupplyCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Assegna una scorta a un appartamento"""
     # Verifica che l'appartamento esista
@@ -135,18 +194,14 @@ def add_supply_to_apartment(
     if not supply:
         raise HTTPException(status_code=404, detail="Supply not found")
     
-    # Verifica che non sia già assegnata
-    existing = db.query(models.ApartmentSupply).filter(
-        models.ApartmentSupply.apartment_id == apartment_id,
-        models.ApartmentSupply.supply_id == data.supply_id
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Supply already assigned to this apartment")
-    
+    # I duplicati sono bloccati dall'indice univoco (apartment_id, supply_id)
     apartment_supply = models.ApartmentSupply(**data.model_dump())
     db.add(apartment_supply)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Supply already assigned to this apartment")
     db.refresh(apartment_supply)
     return apartment_supply
 
@@ -156,7 +211,7 @@ def update_apartment_supply(
     apartment_supply_id: int,
     data: schemas.ApartmentSupplyUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)  # Operatori possono aggiornare
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)  # Operatori possono aggiornare
 ):
     """Aggiorna l'assegnazione di una scorta a un appartamento"""
     apartment_supply = db.query(models.ApartmentSupply).filter(
@@ -181,7 +236,7 @@ def update_apartment_supply(
 def remove_supply_from_apartment(
     apartment_supply_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Rimuovi l'assegnazione di una scorta da un appartamento"""
     apartment_supply = db.query(models.ApartmentSupply).filter(
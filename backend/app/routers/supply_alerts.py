@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 from .. import models, schemas, auth
 from ..database import get_db
+from ..utils import keyset_paginate
 
 router = APIRouter(prefix="/supply-alerts", tags=["supply-alerts"])
 
@@ -12,8 +13,11 @@ router = APIRouter(prefix="/supply-alerts", tags=["supply-alerts"])
 def get_supply_alerts(
     supply_id: Optional[int] = Query(None),
     is_resolved: Optional[bool] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, description="Valore di X-Next-Cursor della pagina precedente"),
+    response: Response = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     query = db.query(models.SupplyAlert)
     
@@ -23,14 +27,21 @@ def get_supply_alerts(
     if is_resolved is not None:
         query = query.filter(models.SupplyAlert.is_resolved == is_resolved)
     
-    return query.order_by(models.SupplyAlert.created_at.desc()).all()
+    return keyset_paginate(
+        query,
+        models.SupplyAlert.created_at,
+        models.SupplyAlert.id,
+        cursor,
+        limit,
+        response
+    )
 
 
 @router.post("", response_model=schemas.SupplyAlert)
 def create_supply_alert(
     alert_data: schemas.SupplyAlertCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     alert = models.SupplyAlert(**alert_data.model_dump())
     db.add(alert)
@@ -43,7 +54,7 @@ def create_supply_alert(
 def resolve_supply_alert(
     alert_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     alert = db.query(models.SupplyAlert).filter(models.SupplyAlert.id == alert_id).first()
     if not alert:
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from .. import models, schemas, auth
+from .. import models, schemas, auth, response_cache
 from ..database import get_db
+from ..stats import delete_daily_stats
 import secrets
 import string
 
@@ -18,7 +19,8 @@ def generate_random_password(length: int = 12) -> str:
 def get_users(
     role: Optional[str] = Query(None),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user),
+    not_modified: None = Depends(response_cache.conditional_get("users", db_dependency=get_db))
 ):
     query = db.query(models.User)
     
@@ -32,7 +34,7 @@ def get_users(
 def create_user(
     user_data: schemas.UserCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     # Verifica se l'utente esiste già
     existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
@@ -58,7 +60,7 @@ def create_user(
 def invite_user(
     user_data: schemas.UserInvite,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     # Verifica se l'utente esiste già
     existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
@@ -92,7 +94,7 @@ def update_user(
     user_id: int,
     user_data: schemas.UserUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
@@ -112,12 +114,18 @@ def update_user(
         if existing_user:
             raise HTTPException(status_code=400, detail="Esiste già un utente con questa email")
     
+    # Cambi di ruolo, email o password revocano i token già emessi
+    if any(getattr(user, key) != update_data[key] for key in ('role', 'email', 'hashed_password') if key in update_data):
+        user.token_version += 1
+    
     # Applica gli aggiornamenti
+    previous_email = user.email
     for key, value in update_data.items():
         setattr(user, key, value)
     
     db.commit()
     db.refresh(user)
+    auth.user_changed(user, previous_email)
     
     return user
 
@@ -126,7 +134,7 @@ def update_user(
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     # Non permettere di eliminare se stesso
     if user_id == current_user.id:
@@ -136,8 +144,11 @@ def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="Utente non trovato")
     
+    email = user.email
+    delete_daily_stats(db, user_id=user_id)
     db.delete(user)
     db.commit()
+    auth.user_deleted(user_id, email)
     
     return {"message": "Utente eliminato con successo"}
 
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime
 
 from .. import models, schemas, auth
-from ..database import get_db
+from ..database import get_db, get_async_db
+from ..utils import finish_keyset_page, keyset_queries
+from ..stats import record_completions, record_session_time
+from .completions import apply_completion_operations
 
 router = APIRouter(prefix="/work-sessions", tags=["work-sessions"])
 
@@ -13,7 +18,7 @@ router = APIRouter(prefix="/work-sessions", tags=["work-sessions"])
 def create_work_session(
     session_data: schemas.WorkSessionCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     """Crea una nuova work session (operazione)"""
     # Verifica che l'appartamento esista
@@ -37,39 +42,50 @@ def create_work_session(
 
 
 @router.get("", response_model=List[schemas.WorkSession])
-def get_work_sessions(
+async def get_work_sessions(
     user_id: Optional[int] = Query(None),
     apartment_id: Optional[int] = Query(None),
-    limit: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, description="Valore di X-Next-Cursor della pagina precedente"),
+    response: Response = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user_async)
 ):
     """Ottiene la lista delle work sessions con filtri opzionali"""
-    query = db.query(models.WorkSession)
+    query = select(models.WorkSession)
     
     if user_id is not None:
-        query = query.filter(models.WorkSession.user_id == user_id)
+        query = query.where(models.WorkSession.user_id == user_id)
     
     if apartment_id is not None:
-        query = query.filter(models.WorkSession.apartment_id == apartment_id)
+        query = query.where(models.WorkSession.apartment_id == apartment_id)
     
     # Ordina per data di inizio decrescente (più recenti prima)
-    query = query.order_by(models.WorkSession.start_time.desc())
-    
-    if limit is not None:
-        query = query.limit(limit)
-    
-    return query.all()
+    # start_time non è mai NULL: una sola query
+    (page_query,) = keyset_queries(
+        query,
+        models.WorkSession.start_time,
+        models.WorkSession.id,
+        cursor,
+        limit
+    )
+    return finish_keyset_page(
+        (await db.execute(page_query)).scalars().all(),
+        models.WorkSession.start_time,
+        models.WorkSession.id,
+        limit,
+        response
+    )
 
 
 @router.get("/{session_id}", response_model=schemas.WorkSession)
-def get_work_session(
+async def get_work_session(
     session_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user_async)
 ):
     """Ottiene i dettagli di una work session specifica"""
-    session = db.query(models.WorkSession).filter(models.WorkSession.id == session_id).first()
+    session = await db.get(models.WorkSession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Work session non trovata")
     
@@ -81,7 +97,7 @@ def update_work_session(
     session_id: int,
     session_data: schemas.WorkSessionUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
 ):
     """Aggiorna una work session (es. per chiuderla con end_time)"""
     session = db.query(models.WorkSession).filter(models.WorkSession.id == session_id).first()
@@ -97,7 +113,58 @@ def update_work_session(
         session.notes = session_data.notes
     
     if session_data.end_time is not None:
+        # Aggiorna il riepilogo giornaliero con la nuova durata
+        record_session_time(db, session, -1)
         session.end_time = session_data.end_time
+        record_session_time(db, session)
+    
+    db.commit()
+    db.refresh(session)
+    
+    return session
+
+
+@router.post("/{session_id}/close", response_model=schemas.WorkSession)
+def close_work_session(
+    session_id: int,
+    close_data: schemas.WorkSessionClose,
+    db: Session = Depends(get_db),
+    current_user: auth.CurrentUser = Depends(auth.get_current_user)
+):
+    """Chiude una work session salvando completamenti e quantità delle scorte in un'unica transazione"""
+    session = db.query(models.WorkSession).filter(models.WorkSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Work session non trovata")
+    
+    if current_user.role != 'admin' and session.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Non autorizzato")
+    
+    # Una sessione già chiusa viene restituita così com'è (retry del client)
+    if session.end_time is not None:
+        return session
+    
+    apply_completion_operations(db, session, close_data.completions, current_user.id)
+    
+    if close_data.supplies:
+        quantities = {s.apartment_supply_id: s.required_quantity for s in close_data.supplies}
+        apartment_supplies = db.query(models.ApartmentSupply).filter(
+            models.ApartmentSupply.id.in_(quantities.keys()),
+            models.ApartmentSupply.apartment_id == session.apartment_id
+        ).all()
+        
+        if len(apartment_supplies) != len(quantities):
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Apartment supply assignment not found")
+        
+        now = datetime.utcnow()
+        for apartment_supply in apartment_supplies:
+            apartment_supply.required_quantity = quantities[apartment_supply.id]
+            apartment_supply.updated_at = now
+    
+    if close_data.notes is not None:
+        session.notes = close_data.notes
+    session.end_time = close_data.end_time or datetime.utcnow()
+    record_session_time(db, session)
     
     db.commit()
     db.refresh(session)
@@ -109,13 +176,15 @@ def update_work_session(
 def delete_work_session(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_admin_user)
+    current_user: auth.CurrentUser = Depends(auth.get_current_admin_user)
 ):
     """Elimina una work session (solo admin)"""
     session = db.query(models.WorkSession).filter(models.WorkSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Work session non trovata")
     
+    record_completions(db, session.completions, -1)
+    record_session_time(db, session, -1)
     db.delete(session)
     db.commit()
     
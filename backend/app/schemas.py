@@ -1,6 +1,17 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import datetime
+from pydantic import AfterValidator, BaseModel, EmailStr, TypeAdapter
+from typing import Annotated, Dict, Literal, Optional, List
+from datetime import date, datetime, timezone
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    """Il database salva le date in UTC senza fuso: quelle con fuso (es. "...Z" dal browser) vengono convertite"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# Date ricevute dal client, confrontabili con quelle salvate (datetime.utcnow())
+UTCDatetime = Annotated[datetime, AfterValidator(_to_naive_utc)]
 
 
 # User Schemas
@@ -42,6 +53,11 @@ class Token(BaseModel):
     user: User
 
 
+class CurrentUserUpdated(User):
+    # Token nuovo: cambiare email o ruolo revoca quelli emessi finora
+    token: str
+
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -205,7 +221,7 @@ class WorkSessionCreate(BaseModel):
 
 class WorkSessionUpdate(BaseModel):
     notes: Optional[str] = None
-    end_time: Optional[datetime] = None
+    end_time: Optional[UTCDatetime] = None
 
 
 class WorkSession(WorkSessionBase):
@@ -234,7 +250,7 @@ class ChecklistCompletionCreate(ChecklistCompletionBase):
 
 class ChecklistCompletion(ChecklistCompletionBase):
     id: int
-    completed_at: datetime
+    completed_at: Optional[datetime] = None  # NULL solo su righe vecchie
     apartment_id: Optional[int] = None  # Viene popolato dal router tramite join
     checklist_item_title: Optional[str] = None  # Titolo della checklist item
 
@@ -242,6 +258,20 @@ class ChecklistCompletion(ChecklistCompletionBase):
         from_attributes = True
 
 
+class ChecklistCompletionOperation(BaseModel):
+    op: Literal['upsert', 'delete'] = 'upsert'
+    checklist_item_id: int
+    idempotency_key: Optional[str] = None  # Generata dal client, evita duplicati sui retry
+    notes: Optional[str] = None
+    value_number: Optional[int] = None
+    value_bool: Optional[bool] = None
+
+
+class ChecklistCompletionBatch(BaseModel):
+    work_session_id: int
+    operations: List[ChecklistCompletionOperation]
+
+
 # Supply Schemas (Scorte Globali)
 class SupplyBase(BaseModel):
     name: str
@@ -293,6 +323,11 @@ class ApartmentSupplyUpdate(BaseModel):
     min_quantity: Optional[int] = None
 
 
+class ApartmentSupplyQuantity(BaseModel):
+    apartment_supply_id: int
+    required_quantity: int
+
+
 class ApartmentSupply(ApartmentSupplyBase):
     id: int
     created_at: datetime
@@ -321,16 +356,79 @@ class SupplyAlertCreate(SupplyAlertBase):
 class SupplyAlert(SupplyAlertBase):
     id: int
     is_resolved: bool
-    created_at: datetime
+    created_at: Optional[datetime] = None  # NULL solo su righe vecchie
     resolved_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+# Chiusura atomica di una work session
+class WorkSessionClose(BaseModel):
+    end_time: Optional[UTCDatetime] = None  # Default: ora corrente
+    notes: Optional[str] = None
+    completions: List[ChecklistCompletionOperation] = []
+    supplies: List[ApartmentSupplyQuantity] = []
+
+
+# Dashboard Schemas
+class ApartmentSummary(BaseModel):
+    apartment_id: int
+    apartment_name: str
+    property_id: int
+    assigned_items: int = 0  # Checklist assegnate all'appartamento
+    completed_items: int = 0  # Checklist completate nell'ultima work session
+    completions_count: int = 0  # Completamenti totali registrati
+    open_alerts: int = 0  # Alert aperti sulle scorte assegnate
+    active_sessions: int = 0  # Work session senza end_time
+    last_cleaned_at: Optional[datetime] = None
+
+
+class DashboardSummary(BaseModel):
+    total_apartments: int
+    open_alerts: int
+    active_sessions: int
+    apartments: List[ApartmentSummary]
+
+
+class ApartmentDailyStats(BaseModel):
+    apartment_id: int
+    day: date
+    user_id: int
+    completions_count: int
+    mandatory_count: int
+    session_minutes: int
+
+    class Config:
+        from_attributes = True
+
+
+# Diagnostics Schemas
+class SlowQuery(BaseModel):
+    statement: str  # Query normalizzata, senza valori
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    last_seen: Optional[datetime] = None
+    routes: Dict[str, int]  # Route di origine -> esecuzioni lente
+    parameter_shapes: List[str]  # Tipi dei parametri, es. '(int, str)'
+    plan: Optional[str] = None  # EXPLAIN QUERY PLAN (SQLite) / EXPLAIN (PostgreSQL)
+
+
 # Email Schema
 class EmailSend(BaseModel):
     to: str
     subject: str
     body: str
 
+
+
+# Adapter precompilati delle liste grandi, serializzate direttamente in JSON (utils.dump_json)
+ChecklistItemList = TypeAdapter(List[ChecklistItem])
+SupplyList = TypeAdapter(List[Supply])
+ChecklistCompletionList = TypeAdapter(List[ChecklistCompletion])
+ApartmentSupplyWithDetailsList = TypeAdapter(List[ApartmentSupplyWithDetails])
+ApartmentSuppliesByApartment = TypeAdapter(Dict[int, List[ApartmentSupplyWithDetails]])
+ApartmentChecklistItemWithDetailsList = TypeAdapter(List[ApartmentChecklistItemWithDetails])
+ApartmentChecklistItemsByApartment = TypeAdapter(Dict[int, List[ApartmentChecklistItemWithDetails]])
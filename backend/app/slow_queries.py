@@ -0,0 +1,196 @@
+"""
+Log delle query lente
+
+Le query più lente di SLOW_QUERY_THRESHOLD_MS vengono registrate con la forma
+normalizzata, i tipi dei parametri, la route di origine e il piano di esecuzione
+(EXPLAIN QUERY PLAN su SQLite, EXPLAIN su PostgreSQL), aggregate in memoria per
+forma della query. Le statistiche sono per processo: con più worker ognuno ha le sue.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional
+import logging
+
+from .config import settings
+from .query_stats import add_query_listener, statement_shape
+
+logger = logging.getLogger(__name__)
+
+_current_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+# Istruzioni di cui ha senso chiedere il piano
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+# Route e tipi di parametri diversi conservati per ogni forma
+_MAX_VARIANTS = 10
+
+
+@contextmanager
+def track_route(scope: dict):
+    """Associa le query eseguite nel blocco alla richiesta (lo scope ASGI, condiviso con il router)"""
+    token = _current_scope.set(scope)
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+
+
+def _current_route() -> str:
+    scope = _current_scope.get()
+    if scope is None:
+        return "-"
+    # Dopo il routing FastAPI mette la route nello scope: si usa il template (/apartments/{apartment_id})
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def _value_type(value) -> str:
+    return "null" if value is None else type(value).__name__
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """Tipi dei parametri senza i valori, es. '(int, str)' o '{id_1: int}'"""
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+        prefix = f"{len(parameters)} righe x "
+    else:
+        prefix = ""
+
+    if isinstance(parameters, dict):
+        shape = "{" + ", ".join(f"{key}: {_value_type(value)}" for key, value in parameters.items()) + "}"
+    else:
+        types = [_value_type(value) for value in parameters or ()]
+        # Liste lunghe (IN con molti id): tipo e numero invece di ripetere il tipo
+        if len(types) > 10 and len(set(types)) == 1:
+            shape = f"({types[0]} x {len(types)})"
+        else:
+            shape = "(" + ", ".join(types) + ")"
+    return prefix + shape
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    """Piano di esecuzione su un cursore DBAPI separato (non passa dagli eventi dell'engine)"""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        explain = "EXPLAIN QUERY PLAN " + statement
+    elif dialect == "postgresql":
+        explain = "EXPLAIN " + statement
+    else:
+        return ""
+
+    cursor = conn.connection.cursor()
+    try:
+        if dialect == "postgresql":
+            # Un errore in EXPLAIN non deve far abortire la transazione della richiesta
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(explain, parameters)
+            rows = cursor.fetchall()
+        except Exception as e:
+            if dialect == "postgresql":
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return f"EXPLAIN non disponibile: {e}"
+        if dialect == "postgresql":
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+
+    if dialect == "sqlite":
+        # Righe (id, parent, notused, detail)
+        return "\n".join(str(row[-1]) for row in rows)
+    return "\n".join(str(row[0]) for row in rows)
+
+
+class SlowQueryStats:
+    def __init__(self, shape: str):
+        self.shape = shape
+        self.count = 0
+        self.total_time = 0.0  # Secondi
+        self.max_time = 0.0
+        self.last_seen: Optional[datetime] = None
+        self.routes = Counter()
+        self.parameter_shapes = Counter()
+        self.plan: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "statement": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_time * 1000, 2),
+            "mean_ms": round(self.total_time * 1000 / self.count, 2),
+            "max_ms": round(self.max_time * 1000, 2),
+            "last_seen": self.last_seen,
+            "routes": dict(self.routes.most_common()),
+            "parameter_shapes": [shape for shape, _ in self.parameter_shapes.most_common()],
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """Statistiche aggregate delle query lente, per forma della query"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: Dict[str, SlowQueryStats] = {}
+        self._lock = Lock()
+
+    def record(self, conn, statement: str, parameters, executemany: bool, duration: float):
+        shape = statement_shape(statement)
+        route = _current_route()
+        params = parameter_shape(parameters, executemany)
+
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    # Fa spazio togliendo la forma che ha pesato meno
+                    del self._entries[min(self._entries.values(), key=lambda e: e.total_time).shape]
+                entry = self._entries[shape] = SlowQueryStats(shape)
+
+            entry.count += 1
+            entry.total_time += duration
+            entry.max_time = max(entry.max_time, duration)
+            entry.last_seen = datetime.utcnow()
+            if route in entry.routes or len(entry.routes) < _MAX_VARIANTS:
+                entry.routes[route] += 1
+            if params in entry.parameter_shapes or len(entry.parameter_shapes) < _MAX_VARIANTS:
+                entry.parameter_shapes[params] += 1
+            needs_plan = entry.plan is None
+
+        # Il piano si cattura solo la prima volta per ogni forma
+        if needs_plan and settings.SLOW_QUERY_EXPLAIN and not executemany \
+                and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            entry.plan = _explain(conn, statement, parameters)
+
+        logger.warning(
+            "Query lenta (%.1f ms) su %s: %s params=%s%s",
+            duration * 1000, route, shape, params,
+            f"\n{entry.plan}" if needs_plan and entry.plan else ""
+        )
+
+    def entries(self) -> List[dict]:
+        """Forme registrate, dalla più pesante in tempo totale"""
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e.total_time, reverse=True)
+            return [entry.as_dict() for entry in entries]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_MAX_ENTRIES)
+
+
+def _on_query(conn, cursor, statement, parameters, executemany, duration):
+    if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        slow_query_log.record(conn, statement, parameters, executemany, duration)
+
+
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    add_query_listener(_on_query)
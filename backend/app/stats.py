@@ -0,0 +1,131 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import Integer, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from . import models
+
+STATS_COLUMNS = ("completions_count", "mandatory_count", "session_minutes")
+
+
+def _increment(db: Session, apartment_id: int, day, user_id: int, **deltas):
+    """Somma i delta alla riga (apartment_id, day, user_id) con un upsert atomico"""
+    table = models.ApartmentDailyStats.__table__
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+    values = {column: 0 for column in STATS_COLUMNS}
+    values.update(deltas)
+    statement = dialect_insert(table).values(apartment_id=apartment_id, day=day, user_id=user_id, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["apartment_id", "day", "user_id"],
+        set_={column: table.c[column] + statement.excluded[column] for column in deltas}
+    )
+    db.execute(statement)
+
+    if any(delta < 0 for delta in deltas.values()):
+        # Una riga tornata a zero non serve più (e bloccherebbe l'eliminazione di appartamento o utente)
+        db.execute(table.delete().where(
+            table.c.apartment_id == apartment_id,
+            table.c.day == day,
+            table.c.user_id == user_id,
+            *(table.c[column] == 0 for column in STATS_COLUMNS)
+        ))
+
+
+def delete_daily_stats(db: Session, apartment_ids=None, user_id: int = None):
+    """Elimina il riepilogo di appartamenti o di un utente prima di eliminarli (chiavi esterne)"""
+    query = db.query(models.ApartmentDailyStats)
+    if apartment_ids is not None:
+        query = query.filter(models.ApartmentDailyStats.apartment_id.in_(apartment_ids))
+    if user_id is not None:
+        query = query.filter(models.ApartmentDailyStats.user_id == user_id)
+    query.delete(synchronize_session=False)
+
+
+def record_completions(db: Session, completions, sign: int = 1):
+    """Aggiorna il riepilogo per completamenti creati (sign=1) o eliminati (sign=-1)"""
+    completions = [c for c in completions if c.apartment_id is not None]
+    if not completions:
+        return
+
+    item_ids = {c.checklist_item_id for c in completions}
+    mandatory = {
+        row.id for row in db.query(models.ChecklistItem.id).filter(
+            models.ChecklistItem.id.in_(item_ids),
+            models.ChecklistItem.is_mandatory == True
+        )
+    }
+
+    deltas = defaultdict(lambda: {"completions_count": 0, "mandatory_count": 0})
+    for completion in completions:
+        day = (completion.completed_at or datetime.utcnow()).date()
+        key = (completion.apartment_id, day, completion.user_id)
+        deltas[key]["completions_count"] += sign
+        if completion.checklist_item_id in mandatory:
+            deltas[key]["mandatory_count"] += sign
+
+    for (apartment_id, day, user_id), values in deltas.items():
+        _increment(db, apartment_id, day, user_id, **values)
+
+
+def record_session_time(db: Session, session: models.WorkSession, sign: int = 1):
+    """Aggiunge (sign=1) o toglie (sign=-1) la durata di una work session chiusa"""
+    if session.end_time is None or session.start_time is None:
+        return
+
+    minutes = int((session.end_time - session.start_time).total_seconds() // 60)
+    _increment(
+        db,
+        session.apartment_id,
+        session.start_time.date(),
+        session.user_id,
+        session_minutes=sign * minutes
+    )
+
+
+def rebuild_daily_stats(db: Session) -> int:
+    """Ricalcola da zero il riepilogo partendo da checklist_completions e work_sessions"""
+    rows = defaultdict(lambda: {column: 0 for column in STATS_COLUMNS})
+
+    day = func.date(models.ChecklistCompletion.completed_at)
+    completion_stats = db.query(
+        models.ChecklistCompletion.apartment_id,
+        day.label("day"),
+        models.ChecklistCompletion.user_id,
+        func.count(models.ChecklistCompletion.id).label("completions_count"),
+        func.sum(models.ChecklistItem.is_mandatory.cast(Integer)).label("mandatory_count")
+    ).join(
+        models.ChecklistItem,
+        models.ChecklistItem.id == models.ChecklistCompletion.checklist_item_id
+    ).filter(
+        models.ChecklistCompletion.apartment_id.isnot(None),
+        models.ChecklistCompletion.completed_at.isnot(None)
+    ).group_by(
+        models.ChecklistCompletion.apartment_id,
+        day,
+        models.ChecklistCompletion.user_id
+    )
+
+    for row in completion_stats:
+        day_value = row.day if not isinstance(row.day, str) else datetime.strptime(row.day, "%Y-%m-%d").date()
+        key = (row.apartment_id, day_value, row.user_id)
+        rows[key]["completions_count"] = row.completions_count
+        rows[key]["mandatory_count"] = row.mandatory_count or 0
+
+    sessions = db.query(
+        models.WorkSession.apartment_id,
+        models.WorkSession.user_id,
+        models.WorkSession.start_time,
+        models.WorkSession.end_time
+    ).filter(models.WorkSession.end_time.isnot(None)).yield_per(1000)
+
+    for session in sessions:
+        key = (session.apartment_id, session.start_time.date(), session.user_id)
+        rows[key]["session_minutes"] += int((session.end_time - session.start_time).total_seconds() // 60)
+
+    db.query(models.ApartmentDailyStats).delete(synchronize_session=False)
+    db.bulk_insert_mappings(models.ApartmentDailyStats, [
+        {"apartment_id": apartment_id, "day": day_value, "user_id": user_id, **values}
+        for (apartment_id, day_value, user_id), values in rows.items()
+    ])
+    return len(rows)
@@ -0,0 +1,52 @@
+"""
+Contatori delle scritture per tabella (tabella table_versions)
+
+Dopo ogni flush di una sessione ORM il contatore delle tabelle modificate viene
+incrementato nella stessa transazione: il valore letto insieme ai dati è sempre
+coerente con essi, tra worker diversi e dopo i riavvii. Leggere i contatori è una
+query per chiave primaria, molto più leggera della lista che rappresentano.
+Sono contate solo le tabelle in TRACKED_TABLES (una riga per tabella, creata dalla
+migrazione 0007): le tabelle scritte spesso, come i completamenti, restano fuori.
+"""
+
+from itertools import chain
+from typing import Iterable, Set
+
+from sqlalchemy import column, event, select, table
+
+TRACKED_TABLES = frozenset({"properties", "apartments", "rooms", "users"})
+
+table_versions = table("table_versions", column("table_name"), column("version"))
+
+
+def versions_query(tables: Iterable[str]):
+    return select(table_versions.c.table_name, table_versions.c.version).where(
+        table_versions.c.table_name.in_(sorted(tables))
+    )
+
+
+def changed_tables(session) -> Set[str]:
+    """Tabelle con righe inserite, modificate o eliminate nel flush in corso"""
+    tables = {type(obj).__table__.name for obj in chain(session.new, session.deleted)}
+    # dirty comprende anche gli oggetti con attributi riassegnati allo stesso valore
+    tables.update(
+        type(obj).__table__.name for obj in session.dirty
+        if session.is_modified(obj, include_collections=False)
+    )
+    return tables
+
+
+def _after_flush(session, flush_context):
+    # Durante after_flush new/dirty/deleted descrivono ancora le modifiche appena scritte
+    tables = changed_tables(session) & TRACKED_TABLES
+    if tables:
+        session.connection().execute(
+            table_versions.update()
+            .where(table_versions.c.table_name.in_(sorted(tables)))
+            .values(version=table_versions.c.version + 1)
+        )
+
+
+def track_writes(session_class):
+    """Collega i contatori a una classe di sessione (Session copre anche le AsyncSession)"""
+    event.listen(session_class, "after_flush", _after_flush)
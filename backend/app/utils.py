@@ -0,0 +1,153 @@
+from fastapi import HTTPException, Response
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import tuple_
+from datetime import datetime
+from typing import List, Optional, Tuple, Type
+import base64
+import binascii
+import json
+
+
+def parse_id_list(value: str) -> List[int]:
+    """Converte una lista di id separati da virgola (es: "1,2,3") in una lista di interi"""
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid id list")
+
+    # Rimuove i duplicati mantenendo l'ordine
+    return list(dict.fromkeys(ids))
+
+
+def parse_fields(value: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Campi richiesti con il parametro fields (es: "id,name"), validati sullo schema
+    e nell'ordine dello schema; None se il parametro manca (tutti i campi)
+    """
+    if value is None:
+        return None
+
+    requested = {part.strip() for part in value.split(",") if part.strip()}
+    if not requested:
+        raise HTTPException(status_code=422, detail="Specify at least one field")
+
+    unknown = requested - schema.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(schema.model_fields)}"
+        )
+
+    return tuple(name for name in schema.model_fields if name in requested)
+
+
+@lru_cache(maxsize=256)
+def partial_list_adapter(schema: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    """Adapter di List[schema] con i soli campi richiesti (un modello per combinazione, riusato)"""
+    model = create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    )
+    return TypeAdapter(List[model])
+
+
+def dump_json(adapter: TypeAdapter, value) -> bytes:
+    """
+    Oggetti ORM (o righe di select()) in JSON secondo lo schema dell'adapter: gli attributi
+    vengono letti direttamente e serializzati da pydantic-core, senza il passaggio
+    da dict intermedi di jsonable_encoder
+    """
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def dump_rows_json(adapter: TypeAdapter, rows) -> bytes:
+    """
+    Come dump_json per le righe di select() su singole colonne: l'accesso per attributo
+    alle Row è lento, la coppia nomi delle colonne + valori della tupla lo è molto meno
+    """
+    if not rows:
+        return adapter.dump_json([])
+    keys = rows[0]._fields
+    return adapter.dump_json(adapter.validate_python([dict(zip(keys, row)) for row in rows]))
+
+
+def json_bytes_response(body: bytes, response: Optional[Response] = None) -> Response:
+    """Risposta con JSON già serializzato; mantiene gli header impostati sul parametro response (es. X-Next-Cursor)"""
+    json_response = Response(content=body, media_type="application/json")
+    if response is not None:
+        json_response.headers.update(response.headers)
+    return json_response
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    """Cursore opaco per la paginazione keyset: la coppia (timestamp, id) in base64 (timestamp null = None)"""
+    raw = json.dumps([sort_value.isoformat() if sort_value is not None else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), int(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_queries(query, sort_column, id_column, cursor: Optional[str], limit: Optional[int]) -> list:
+    """
+    Query della pagina ordinate per (sort_column, id) decrescente, da eseguire in ordine fermandosi
+    appena si hanno più di limit righe. Ognuna è una ricerca nell'indice (sort_column, id):
+    se sort_column ammette NULL, le righe senza valore seguono tutte le altre in un segmento
+    ordinato per id, letto da una seconda query solo quando le righe con valore finiscono.
+    Funziona sia con Query (sessione sync) sia con select() (sessione async).
+    Legge una riga in più di limit per sapere se esiste la pagina successiva.
+    """
+    sort_value, row_id = decode_cursor(cursor) if cursor is not None else (None, None)
+    nullable = getattr(sort_column.expression, "nullable", True)
+    if cursor is not None and sort_value is None and not nullable:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    queries = []
+    if cursor is None or sort_value is not None:
+        if cursor is not None:
+            # Il confronto tra tuple esclude già le righe con NULL
+            seek = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+        elif nullable:
+            seek = query.filter(sort_column.is_not(None))
+        else:
+            seek = query
+        queries.append(seek.order_by(sort_column.desc(), id_column.desc()))
+
+    if nullable:
+        nulls = query.filter(sort_column.is_(None))
+        if cursor is not None and sort_value is None:
+            nulls = nulls.filter(id_column < row_id)
+        queries.append(nulls.order_by(id_column.desc()))
+
+    if limit is not None:
+        queries = [q.limit(limit + 1) for q in queries]
+    return queries
+
+
+def finish_keyset_page(rows, sort_column, id_column, limit: Optional[int], response: Response):
+    """Taglia la riga in più e mette il cursore della pagina successiva nell'header X-Next-Cursor"""
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+
+    return rows
+
+
+def keyset_paginate(query, sort_column, id_column, cursor: Optional[str], limit: Optional[int], response: Response):
+    """Paginazione keyset per una Query sync"""
+    rows = []
+    for page_query in keyset_queries(query, sort_column, id_column, cursor, limit):
+        rows += page_query.all()
+        if limit is not None and len(rows) > limit:
+            break
+    return finish_keyset_page(rows, sort_column, id_column, limit, response)
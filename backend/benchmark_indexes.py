@@ -0,0 +1,181 @@
+"""
+Benchmark degli indici sui percorsi più usati
+Crea un database SQLite temporaneo con N completamenti (default 1.000.000),
+misura le query principali senza gli indici nuovi e poi con gli indici
+
+Uso: python benchmark_indexes.py [--completions N] [--repeat R]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex
+
+# La configurazione dell'app viene letta all'import: il benchmark usa un proprio database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.database import Base
+from app import models
+
+# Indici aggiunti per i percorsi più usati
+NEW_INDEXES = [
+    "ux_apartment_checklist_items_apartment_item",
+    "ux_apartment_supplies_apartment_supply",
+    "ix_checklist_completions_work_session_id",
+    "ix_checklist_completions_checklist_item_id_completed_at",
+    "ix_work_sessions_apartment_id_start_time",
+    "ix_supply_alerts_is_resolved_created_at",
+]
+
+QUERIES = {
+    "checklist di un appartamento": (
+        "SELECT checklist_item_id FROM apartment_checklist_items "
+        "WHERE apartment_id = :apartment_id",
+        lambda: {"apartment_id": random.randint(1, 200)},
+    ),
+    "scorte di un appartamento": (
+        "SELECT supply_id, required_quantity FROM apartment_supplies "
+        "WHERE apartment_id = :apartment_id",
+        lambda: {"apartment_id": random.randint(1, 200)},
+    ),
+    "completamenti di una sessione": (
+        "SELECT id, checklist_item_id FROM checklist_completions "
+        "WHERE work_session_id = :work_session_id",
+        lambda: {"work_session_id": random.randint(1, 50000)},
+    ),
+    "storico di una checklist": (
+        "SELECT id, completed_at FROM checklist_completions "
+        "WHERE checklist_item_id = :checklist_item_id "
+        "ORDER BY completed_at DESC LIMIT 50",
+        lambda: {"checklist_item_id": random.randint(1, 100)},
+    ),
+    "sessioni di un appartamento": (
+        "SELECT id, start_time FROM work_sessions "
+        "WHERE apartment_id = :apartment_id ORDER BY start_time DESC LIMIT 50",
+        lambda: {"apartment_id": random.randint(1, 200)},
+    ),
+    "alert aperti": (
+        "SELECT id FROM supply_alerts WHERE is_resolved = 0 "
+        "ORDER BY created_at DESC LIMIT 50",
+        lambda: {},
+    ),
+}
+
+
+def populate(connection, completions):
+    apartments = 200
+    items = 100
+    supplies = 50
+    sessions = 50000
+    alerts = 20000
+    start = datetime(2024, 1, 1)
+
+    connection.execute("INSERT INTO users (id, email, hashed_password, name, role) VALUES (1, 'bench@example.com', '-', 'Bench', 'operator')")
+    connection.execute("INSERT INTO properties (id, name, address) VALUES (1, 'Bench', '-')")
+    connection.executemany(
+        "INSERT INTO apartments (id, name, property_id) VALUES (?, ?, 1)",
+        [(i, f"Apt {i}") for i in range(1, apartments + 1)],
+    )
+    connection.executemany(
+        "INSERT INTO checklist_items (id, title, item_type) VALUES (?, ?, 'check')",
+        [(i, f"Item {i}") for i in range(1, items + 1)],
+    )
+    connection.executemany(
+        "INSERT INTO supplies (id, name) VALUES (?, ?)",
+        [(i, f"Supply {i}") for i in range(1, supplies + 1)],
+    )
+    connection.executemany(
+        "INSERT INTO apartment_checklist_items (apartment_id, checklist_item_id, \"order\") VALUES (?, ?, 0)",
+        [(a, i) for a in range(1, apartments + 1) for i in range(1, items + 1)],
+    )
+    connection.executemany(
+        "INSERT INTO apartment_supplies (apartment_id, supply_id, required_quantity) VALUES (?, ?, 1)",
+        [(a, s) for a in range(1, apartments + 1) for s in range(1, supplies + 1)],
+    )
+    connection.executemany(
+        "INSERT INTO work_sessions (id, user_id, apartment_id, start_time) VALUES (?, 1, ?, ?)",
+        (
+            (i, random.randint(1, apartments), start + timedelta(minutes=i * 10))
+            for i in range(1, sessions + 1)
+        ),
+    )
+    connection.executemany(
+        "INSERT INTO checklist_completions "
+        "(checklist_item_id, user_id, work_session_id, apartment_id, completed_at) "
+        "VALUES (?, 1, ?, ?, ?)",
+        (
+            (
+                random.randint(1, items),
+                session_id,
+                random.randint(1, apartments),
+                start + timedelta(minutes=session_id * 10, seconds=i % 600),
+            )
+            for i, session_id in ((i, random.randint(1, sessions)) for i in range(completions))
+        ),
+    )
+    connection.executemany(
+        "INSERT INTO supply_alerts (supply_id, message, is_resolved, created_at) VALUES (?, '-', ?, ?)",
+        (
+            (random.randint(1, supplies), i % 10 != 0, start + timedelta(minutes=i))
+            for i in range(alerts)
+        ),
+    )
+    connection.commit()
+
+
+def run_queries(connection, repeat):
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        random.seed(42)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            connection.execute(sql, params()).fetchall()
+        results[name] = (time.perf_counter() - started) / repeat * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degli indici")
+    parser.add_argument("--completions", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+
+    connection = sqlite3.connect(path)
+    for name in NEW_INDEXES:
+        connection.execute(f"DROP INDEX {name}")
+
+    print(f"⏳ Popolamento database con {args.completions} completamenti...")
+    populate(connection, args.completions)
+    connection.execute("ANALYZE")
+
+    before = run_queries(connection, args.repeat)
+
+    indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+    for name in NEW_INDEXES:
+        connection.execute(str(CreateIndex(indexes[name]).compile(engine)))
+    connection.execute("ANALYZE")
+
+    after = run_queries(connection, args.repeat)
+    connection.close()
+    engine.dispose()
+    os.remove(path)
+
+    print(f"\n{'query':<32}{'senza (ms)':>12}{'con (ms)':>12}{'speedup':>10}")
+    for name in QUERIES:
+        print(f"{name:<32}{before[name]:>12.3f}{after[name]:>12.3f}{before[name] / after[name]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
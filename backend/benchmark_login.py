@@ -0,0 +1,113 @@
+"""
+Benchmark del login
+Crea un database SQLite temporaneo con utenti con hash SHA-256 (versione precedente) e bcrypt,
+poi lancia una raffica di login concorrenti misurando i login al secondo e, nello stesso momento,
+la latenza di /api/health: con l'hashing nel pool dedicato gli altri endpoint non devono rallentare
+
+Uso: python benchmark_login.py [--users N] [--logins N] [--concurrency N]
+Il costo e la concorrenza dell'hashing si cambiano con PASSWORD_BCRYPT_ROUNDS e PASSWORD_HASH_MAX_CONCURRENCY
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import statistics
+import tempfile
+import time
+
+PASSWORD = "benchmark-password"
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(app, emails, logins, concurrency):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        login_times = []
+        health_times = []
+        failures = 0
+        done = asyncio.Event()
+
+        async def login(i):
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/auth/login", json={"email": emails[i % len(emails)], "password": PASSWORD})
+                login_times.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    failures += 1
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/api/health")
+                health_times.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return elapsed, login_times, health_times, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del login")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # Il database temporaneo va configurato prima di importare l'app
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    from app.config import settings
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app import models, passwords
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    legacy_hash = hashlib.sha256(PASSWORD.encode()).hexdigest()
+    emails = []
+    for i in range(args.users):
+        email = f"user{i}@benchmark.com"
+        # Metà degli utenti con l'hash della versione precedente, aggiornato al primo login
+        hashed = legacy_hash if i % 2 else passwords.hash_password(PASSWORD)
+        db.add(models.User(email=email, name=f"User {i}", role="operator", hashed_password=hashed))
+        emails.append(email)
+    db.commit()
+
+    print(
+        f"⏳ {args.logins} login con concorrenza {args.concurrency} "
+        f"({settings.PASSWORD_HASH_SCHEME}, rounds={settings.PASSWORD_BCRYPT_ROUNDS}, "
+        f"max {settings.PASSWORD_HASH_MAX_CONCURRENCY} hash contemporanei)..."
+    )
+    elapsed, login_times, health_times, failures = asyncio.run(run(app, emails, args.logins, args.concurrency))
+
+    upgraded = db.query(models.User).filter(models.User.hashed_password.startswith("$2")).count()
+    db.close()
+    engine.dispose()
+    os.remove(path)
+
+    print(f"\nlogin/s:            {args.logins / elapsed:8.1f}  ({failures} falliti)")
+    print(f"login p50 / p95:    {statistics.median(login_times) * 1000:8.1f} / {percentile(login_times, 0.95) * 1000:.1f} ms")
+    print(f"health p50 / p95:   {statistics.median(health_times) * 1000:8.1f} / {percentile(health_times, 0.95) * 1000:.1f} ms")
+    print(f"health max:         {max(health_times) * 1000:8.1f} ms  ({len(health_times)} richieste durante la raffica)")
+    print(f"hash bcrypt:        {upgraded}/{args.users} utenti (gli hash SHA-256 sono stati aggiornati)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark della serializzazione delle liste grandi
+Crea un database SQLite temporaneo con N completamenti e N scorte assegnate, legge le righe
+una volta e poi misura solo la serializzazione della risposta:
+
+- standard: validazione del response_model e jsonable_encoder di FastAPI, JSONResponse (json.dumps)
+- orjson: stesso percorso ma con ORJSONResponse (la default_response_class dell'app)
+- diretto: TypeAdapter precompilato e JSON scritto da pydantic-core (utils.dump_json per gli oggetti ORM,
+  utils.dump_rows_json per le righe di colonne)
+
+Uso: python benchmark_serialization.py [--rows N] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def best_of(repeat, fn):
+    """Tempo migliore di repeat esecuzioni (ms) e dimensione del risultato"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark della serializzazione delle liste")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Il database temporaneo va configurato prima di importare l'app
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+    from sqlalchemy import select
+    from sqlalchemy.orm import contains_eager
+    from typing import List
+    from app.database import Base, SessionLocal, engine
+    from app import models, schemas
+    from app.utils import dump_json, dump_rows_json
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = models.User(email="benchmark@benchmark.com", name="Benchmark", role="operator", hashed_password="-")
+    prop = models.Property(name="Benchmark", address="Via Roma 1")
+    db.add_all([user, prop])
+    db.flush()
+    apartment = models.Apartment(name="Benchmark", property_id=prop.id)
+    item = models.ChecklistItem(title="Pulire il bagno", room_name="Bagno", item_type="check", order=1)
+    db.add_all([apartment, item])
+    db.flush()
+
+    started_at = datetime(2026, 1, 1)
+    db.bulk_insert_mappings(models.ChecklistCompletion, [
+        {
+            "checklist_item_id": item.id, "user_id": user.id, "apartment_id": apartment.id,
+            "completed_at": started_at + timedelta(minutes=i),
+            "notes": "Tutto in ordine" if i % 3 == 0 else None,
+        }
+        for i in range(args.rows)
+    ])
+    db.bulk_insert_mappings(models.Supply, [
+        {"name": f"Scorta {i}", "total_quantity": i, "unit": "pezzi", "category": "bathroom",
+         "notes": "Da riordinare quando finisce", "created_at": started_at, "updated_at": started_at}
+        for i in range(args.rows)
+    ])
+    db.flush()
+    db.execute(models.ApartmentSupply.__table__.insert().from_select(
+        ["apartment_id", "supply_id", "required_quantity", "min_quantity", "created_at", "updated_at"],
+        select(apartment.id, models.Supply.id, 2, 1, models.Supply.created_at, models.Supply.updated_at)
+    ))
+    db.commit()
+
+    # Stesse query degli endpoint: righe semplici per i completamenti, oggetti ORM con join per le scorte
+    completion_rows = db.execute(
+        select(
+            models.ChecklistCompletion.id,
+            models.ChecklistCompletion.checklist_item_id,
+            models.ChecklistCompletion.user_id,
+            models.ChecklistCompletion.work_session_id,
+            models.ChecklistCompletion.completed_at,
+            models.ChecklistCompletion.notes,
+            models.ChecklistCompletion.value_number,
+            models.ChecklistCompletion.value_bool,
+            models.ChecklistCompletion.apartment_id,
+            models.ChecklistItem.title.label("checklist_item_title")
+        ).join(models.ChecklistItem, models.ChecklistItem.id == models.ChecklistCompletion.checklist_item_id)
+    ).all()
+    supply_rows = db.query(models.ApartmentSupply).join(models.ApartmentSupply.supply).options(
+        contains_eager(models.ApartmentSupply.supply)
+    ).all()
+
+    loop = asyncio.new_event_loop()
+
+    def standard(response_class, field, rows):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=rows))
+        return response_class(content).body
+
+    def completions_dicts():
+        # Percorso precedente di GET /completions: un dict per riga, poi jsonable_encoder
+        results = []
+        for row in completion_rows:
+            completion = dict(row._mapping)
+            completion["completed_at"] = completion["completed_at"].isoformat()
+            results.append(completion)
+        return results
+
+    supply_field = create_model_field("Response", List[schemas.ApartmentSupplyWithDetails], mode="serialization")
+
+    cases = [
+        (f"GET /completions ({len(completion_rows)} righe)", [
+            ("standard", lambda: JSONResponse(jsonable_encoder(completions_dicts())).body),
+            ("orjson", lambda: ORJSONResponse(jsonable_encoder(completions_dicts())).body),
+            ("diretto", lambda: dump_rows_json(schemas.ChecklistCompletionList, completion_rows)),
+        ]),
+        (f"GET /supplies/apartment/{{id}}/supplies ({len(supply_rows)} righe)", [
+            ("standard", lambda: standard(JSONResponse, supply_field, supply_rows)),
+            ("orjson", lambda: standard(ORJSONResponse, supply_field, supply_rows)),
+            ("diretto", lambda: dump_json(schemas.ApartmentSupplyWithDetailsList, supply_rows)),
+        ]),
+    ]
+
+    for title, paths in cases:
+        print(f"\n{title}")
+        baseline = None
+        for name, fn in paths:
+            elapsed, size = best_of(args.repeat, fn)
+            baseline = baseline or elapsed
+            print(f"  {name:10s} {elapsed:8.1f} ms  {size / 1024:8.0f} KiB  {baseline / elapsed:5.1f}x")
+
+    loop.close()
+    db.close()
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
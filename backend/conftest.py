@@ -0,0 +1,48 @@
+"""
+Configurazione dei test pytest: database SQLite temporaneo con lo schema di Alembic
+Esegui con: python -m pytest
+"""
+
+import os
+import tempfile
+
+import pytest
+
+# Il database dei test va configurato prima di importare l'app
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_READ_URL"] = ""
+os.environ.setdefault("SECRET_KEY", "test")
+
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+
+from app import auth, models, query_stats
+from app.database import SessionLocal
+from app.main import app
+
+# Script da eseguire a mano (server avviato o database locale), non test pytest
+collect_ignore = ["test_api.py", "test_checklist_api.py"]
+
+query_counter = pytest.fixture(query_stats.query_counter)
+
+
+@pytest.fixture(scope="session")
+def client():
+    config = Config(os.path.join(os.path.dirname(__file__), "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(os.path.dirname(__file__), "alembic"))
+    command.upgrade(config, "head")
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    db = SessionLocal()
+    try:
+        admin = models.User(email="admin@test.com", name="Admin", role="admin", hashed_password="-")
+        db.add(admin)
+        db.commit()
+        return {"Authorization": f"Bearer {auth.create_user_token(admin)}"}
+    finally:
+        db.close()
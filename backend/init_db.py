@@ -3,13 +3,15 @@ Script per inizializzare il database con dati di esempio
 Esegui con: python init_db.py
 """
 
-from app.database import SessionLocal, engine
-from app.models import Base, User, Property, Apartment, Room, ChecklistItem, ApartmentChecklistItem, Supply, ApartmentSupply
+from alembic import command
+from alembic.config import Config
+from app.database import SessionLocal
+from app.models import User, Property, Apartment, Room, ChecklistItem, ApartmentChecklistItem, Supply, ApartmentSupply
 from app.auth import get_password_hash
 
 def init_database():
-    print("Creazione tabelle...")
-    Base.metadata.create_all(bind=engine)
+    print("Creazione/aggiornamento tabelle...")
+    command.upgrade(Config("alembic.ini"), "head")
     
     db = SessionLocal()
     
@@ -0,0 +1,28 @@
+"""
+Script per ricalcolare da zero il riepilogo giornaliero (apartment_daily_stats)
+Da usare se i contatori risultano disallineati, ad esempio dopo l'eliminazione
+di checklist o utenti con completamenti associati
+Esegui con: python rebuild_daily_stats.py
+"""
+
+from app.database import SessionLocal
+from app.stats import rebuild_daily_stats
+
+
+def rebuild():
+    print("🔄 Ricalcolo riepilogo giornaliero...")
+    db = SessionLocal()
+    try:
+        count = rebuild_daily_stats(db)
+        db.commit()
+        print(f"✅ Ricalcolo completato: {count} righe")
+    except Exception as e:
+        print(f"❌ Errore durante il ricalcolo: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,52 @@
+"""
+Script per aggiornare lo snapshot SQLite di sola lettura (DATABASE_READ_URL)
+Copia il database principale con la backup API di SQLite in un file temporaneo
+e lo sostituisce in modo atomico: le letture in corso non vengono interrotte
+Esegui con: python refresh_read_snapshot.py            (una volta, es. da cron)
+       oppure: python refresh_read_snapshot.py --every 60 (ogni 60 secondi)
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from sqlalchemy.engine import make_url
+from app.config import settings
+
+
+def refresh():
+    source_path = make_url(settings.DATABASE_URL).database
+    target_path = make_url(settings.DATABASE_READ_URL).database
+    temp_path = f"{target_path}.tmp"
+
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(temp_path)
+    try:
+        source.backup(target)
+        # Lo snapshot usa il journal classico: niente file -wal/-shm per i lettori
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+
+    os.replace(temp_path, target_path)
+    print(f"✅ Snapshot aggiornato: {target_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--every", type=int, default=0, help="Secondi tra un aggiornamento e l'altro")
+    args = parser.parse_args()
+
+    if not settings.DATABASE_READ_URL or "sqlite" not in settings.DATABASE_READ_URL:
+        print("❌ DATABASE_READ_URL deve puntare a un file SQLite")
+        return
+
+    refresh()
+    while args.every > 0:
+        time.sleep(args.every)
+        refresh()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Profilo dell'utente autenticato
+Esegui con: python -m pytest test_auth.py
+"""
+
+from app import auth, models
+from app.database import SessionLocal
+
+
+def test_update_email_returns_fresh_token(client):
+    db = SessionLocal()
+    try:
+        user = models.User(email="profilo@test.com", name="Profilo", role="operator", hashed_password="-")
+        db.add(user)
+        db.commit()
+        headers = {"Authorization": f"Bearer {auth.create_user_token(user)}"}
+    finally:
+        db.close()
+
+    response = client.put("/api/auth/me", json={"email": "profilo2@test.com"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "profilo2@test.com"
+
+    # Il token precedente è revocato, quello restituito funziona
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    fresh = {"Authorization": f"Bearer {response.json()['token']}"}
+    response = client.get("/api/auth/me", headers=fresh)
+    assert response.status_code == 200
+    assert response.json()["email"] == "profilo2@test.com"
@@ -0,0 +1,85 @@
+"""
+Batch dei completamenti con chiavi di idempotenza
+Esegui con: python -m pytest test_completions_batch.py
+"""
+
+import pytest
+
+from app import models
+from app.database import SessionLocal
+
+
+@pytest.fixture
+def session_id(client):
+    """Work session aperta su un appartamento nuovo, con una checklist"""
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).first()
+        prop = models.Property(name="Batch", address="Via Roma 1")
+        db.add(prop)
+        db.flush()
+        apartment = models.Apartment(name="Batch", property_id=prop.id)
+        db.add(apartment)
+        db.flush()
+        session = models.WorkSession(apartment_id=apartment.id, user_id=user.id)
+        db.add(session)
+        db.commit()
+        return session.id
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def item_id(client):
+    db = SessionLocal()
+    try:
+        item = models.ChecklistItem(title="Pulire il bagno", room_name="Bagno")
+        db.add(item)
+        db.commit()
+        return item.id
+    finally:
+        db.close()
+
+
+def test_failed_batch_can_be_retried(client, admin_headers, session_id, item_id):
+    operations = [
+        {"op": "upsert", "checklist_item_id": item_id, "idempotency_key": "k1"},
+        {"op": "upsert", "checklist_item_id": item_id + 1000, "idempotency_key": "k2"},
+    ]
+    response = client.post(
+        "/api/completions/batch",
+        json={"work_session_id": session_id, "operations": operations},
+        headers=admin_headers
+    )
+    assert response.status_code == 404
+
+    # Nessuna chiave resta registrata: il retry corretto viene applicato
+    operations[1]["checklist_item_id"] = item_id
+    operations[1]["op"] = "delete"
+    operations.append({"op": "upsert", "checklist_item_id": item_id, "idempotency_key": "k3"})
+    response = client.post(
+        "/api/completions/batch",
+        json={"work_session_id": session_id, "operations": operations},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert [c["checklist_item_id"] for c in response.json()] == [item_id]
+
+    # Lo stesso batch ripetuto non cambia nulla
+    response = client.post(
+        "/api/completions/batch",
+        json={"work_session_id": session_id, "operations": operations},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+    db = SessionLocal()
+    try:
+        keys = db.query(models.CompletionIdempotencyKey).filter(
+            models.CompletionIdempotencyKey.work_session_id == session_id
+        ).all()
+        assert sorted(key.key for key in keys) == ["k1", "k2", "k3"]
+        assert all(key.created_at is not None for key in keys)
+    finally:
+        db.close()
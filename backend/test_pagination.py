@@ -0,0 +1,61 @@
+"""
+Paginazione keyset con X-Next-Cursor
+Esegui con: python -m pytest test_pagination.py
+"""
+
+from datetime import datetime, timedelta
+
+from app import models
+from app.database import SessionLocal
+
+
+def test_completions_pages_include_null_timestamps(client, admin_headers):
+    """Le righe senza completed_at arrivano in fondo e il cursore può fermarsi su una di esse"""
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).first()
+        prop = models.Property(name="Paginazione", address="Via Roma 1")
+        item = models.ChecklistItem(title="Pulire il bagno", room_name="Bagno")
+        db.add_all([prop, item])
+        db.flush()
+        apartment = models.Apartment(name="Paginazione", property_id=prop.id)
+        db.add(apartment)
+        db.flush()
+        session = models.WorkSession(apartment_id=apartment.id, user_id=user.id)
+        db.add(session)
+        db.flush()
+        started_at = datetime(2026, 1, 1)
+        completions = [
+            models.ChecklistCompletion(
+                checklist_item_id=item.id, user_id=user.id, work_session_id=session.id,
+                completed_at=started_at + timedelta(minutes=i)
+            )
+            for i in range(7)
+        ]
+        db.add_all(completions)
+        db.flush()
+        # Righe vecchie senza timestamp (il default del modello lo imposterebbe sempre)
+        db.query(models.ChecklistCompletion).filter(
+            models.ChecklistCompletion.id.in_([c.id for c in completions[4:]])
+        ).update({models.ChecklistCompletion.completed_at: None}, synchronize_session=False)
+        db.commit()
+        expected = [c.id for c in sorted(completions[:4], key=lambda c: c.completed_at, reverse=True)]
+        expected += sorted((c.id for c in completions[4:]), reverse=True)
+        session_id = session.id
+    finally:
+        db.close()
+
+    ids = []
+    cursor = None
+    while True:
+        params = {"work_session_id": session_id, "limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = client.get("/api/completions", params=params, headers=admin_headers)
+        assert response.status_code == 200
+        ids += [row["id"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert ids == expected
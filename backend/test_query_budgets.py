@@ -0,0 +1,74 @@
+"""
+Budget di query degli endpoint più usati: il numero di query non deve crescere con le righe
+Esegui con: python -m pytest test_query_budgets.py
+"""
+
+import pytest
+
+from app import models
+from app.database import SessionLocal
+from app.query_stats import count_queries
+
+
+@pytest.fixture(scope="module")
+def apartment_id(client):
+    """Appartamento con 20 scorte assegnate"""
+    db = SessionLocal()
+    try:
+        prop = models.Property(name="Budget", address="Via Roma 1")
+        db.add(prop)
+        db.flush()
+        apartment = models.Apartment(name="Budget", property_id=prop.id)
+        supplies = [models.Supply(name=f"Scorta {i}", total_quantity=i, unit="pz") for i in range(20)]
+        db.add(apartment)
+        db.add_all(supplies)
+        db.flush()
+        db.add_all(
+            models.ApartmentSupply(apartment_id=apartment.id, supply_id=supply.id, required_quantity=1)
+            for supply in supplies
+        )
+        db.commit()
+        return apartment.id
+    finally:
+        db.close()
+
+
+def test_apartment_supplies_budget(client, admin_headers, apartment_id, query_counter):
+    response = client.get(f"/api/supplies/apartment/{apartment_id}/supplies", headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 20
+    query_counter.assert_max(3)
+
+
+def _add_completions(apartment_id: int, count: int):
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).first()
+        item = models.ChecklistItem(title="Pulire il bagno", room_name="Bagno")
+        session = models.WorkSession(apartment_id=apartment_id, user_id=user.id)
+        db.add_all([item, session])
+        db.flush()
+        db.add_all(
+            models.ChecklistCompletion(
+                checklist_item_id=item.id, user_id=user.id,
+                work_session_id=session.id, apartment_id=apartment_id
+            )
+            for _ in range(count)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_completions_constant_queries(client, admin_headers, apartment_id):
+    """Il numero di query di GET /api/completions non dipende dai completamenti restituiti"""
+    counts = []
+    for added, total in ((1, 1), (49, 50)):
+        _add_completions(apartment_id, added)
+        with count_queries() as counter:
+            response = client.get(f"/api/completions?apartment_id={apartment_id}", headers=admin_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == total
+        counter.assert_max(2)
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
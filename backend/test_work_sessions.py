@@ -0,0 +1,51 @@
+"""
+Work session: chiusura e aggiornamento con date ISO inviate dal browser
+Esegui con: python -m pytest test_work_sessions.py
+"""
+
+import pytest
+
+from app import models
+from app.database import SessionLocal
+
+
+@pytest.fixture
+def session_id(client):
+    """Work session aperta su un appartamento nuovo"""
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).first()
+        prop = models.Property(name="Sessioni", address="Via Roma 1")
+        db.add(prop)
+        db.flush()
+        apartment = models.Apartment(name="Sessioni", property_id=prop.id)
+        db.add(apartment)
+        db.flush()
+        session = models.WorkSession(apartment_id=apartment.id, user_id=user.id)
+        db.add(session)
+        db.commit()
+        return session.id
+    finally:
+        db.close()
+
+
+def test_close_with_utc_iso_string(client, admin_headers, session_id):
+    # new Date().toISOString() del frontend: fuso UTC con suffisso Z
+    response = client.post(
+        f"/api/work-sessions/{session_id}/close",
+        json={"end_time": "2099-10-18T10:00:00.000Z"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["end_time"].startswith("2099-10-18T10:00:00")
+
+
+def test_update_end_time_with_offset(client, admin_headers, session_id):
+    response = client.patch(
+        f"/api/work-sessions/{session_id}",
+        json={"end_time": "2099-10-18T12:00:00+02:00"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    # Salvata in UTC senza fuso, come le altre date
+    assert response.json()["end_time"] == "2099-10-18T10:00:00"
@@ -59,7 +59,7 @@ if [ -d "backend" ]; then
     
     if [ -z "$DB_FOUND" ]; then
         print_warning "Nessun database esistente trovato"
-        print_info "Il database verrà creato automaticamente all'avvio del backend"
+        print_info "Il database verrà creato dalle migrazioni (alembic upgrade head)"
         print_info "Esegui 'python backend/init_db.py' solo se vuoi dati di esempio"
     fi
 fi
@@ -98,6 +98,16 @@ if [ -d "backend" ]; then
         echo "   CORS_ORIGINS=https://topclean.it,https://www.topclean.it"
     else
         print_success "File backend/.env trovato"
+
+        # Migrazioni del database: crea o aggiorna lo schema senza toccare i dati
+        if command -v alembic >/dev/null 2>&1; then
+            print_warning "Migrazioni database in corso..."
+            (cd backend && alembic upgrade head)
+            print_success "Schema database aggiornato"
+        else
+            print_info "Applica le migrazioni del database:"
+            echo "   cd backend && alembic upgrade head"
+        fi
     fi
 fi
 
@@ -138,10 +138,13 @@ class ApiClient {
   }
 
   async updateCurrentUser(data) {
-    return this.request('/auth/me', {
+    const user = await this.request('/auth/me', {
       method: 'PUT',
       body: JSON.stringify(data),
     });
+    // Cambiare email o ruolo revoca il token precedente: il server ne restituisce uno nuovo
+    this.setToken(user.token);
+    return user;
   }
 
   // PROPERTIES
@@ -245,6 +248,12 @@ class ApiClient {
     return this.request(`/checklist-items/apartment/${apartmentId}/checklist-items`);
   }
 
+  // Restituisce le assegnazioni di più appartamenti raggruppate per apartment_id
+  async getApartmentsChecklists(apartmentIds) {
+    const params = new URLSearchParams({ apartment_ids: apartmentIds.join(',') });
+    return this.request(`/checklist-items/apartments/checklist-items?${params}`);
+  }
+
   async addChecklistToApartment(apartmentId, data) {
     return this.request(`/checklist-items/apartment/${apartmentId}/checklist-items`, {
       method: 'POST',
@@ -284,6 +293,15 @@ class ApiClient {
     });
   }
 
+  // Applica più upsert/delete in un'unica transazione.
+  // operations: [{ op: 'upsert' | 'delete', checklist_item_id, idempotency_key, value_bool, value_number, notes }]
+  async applyCompletionsBatch(workSessionId, operations) {
+    return this.request('/completions/batch', {
+      method: 'POST',
+      body: JSON.stringify({ work_session_id: workSessionId, operations }),
+    });
+  }
+
   // SUPPLIES (Scorte Globali)
   async getSupplies(filters = {}) {
     const params = new URLSearchParams(filters);
@@ -319,6 +337,15 @@ class ApiClient {
     return this.request(`/supplies/apartment/${apartmentId}/supplies`);
   }
 
+  // Restituisce le scorte di più appartamenti raggruppate per apartment_id
+  // filters: { apartment_ids: [1, 2, 3] } oppure { property_id: 1 }
+  async getApartmentsSupplies(filters = {}) {
+    const params = new URLSearchParams();
+    if (filters.apartment_ids) params.set('apartment_ids', filters.apartment_ids.join(','));
+    if (filters.property_id) params.set('property_id', filters.property_id);
+    return this.request(`/supplies/apartments/supplies?${params}`);
+  }
+
   async addSupplyToApartment(apartmentId, data) {
     return this.request(`/supplies/apartment/${apartmentId}/supplies`, {
       method: 'POST',
@@ -415,12 +442,28 @@ class ApiClient {
     });
   }
 
+  // Chiude la sessione salvando completamenti e quantità delle scorte in un'unica transazione
+  // data: { end_time, notes, completions: [...], supplies: [{ apartment_supply_id, required_quantity }] }
+  async closeWorkSession(sessionId, data) {
+    return this.request(`/work-sessions/${sessionId}/close`, {
+      method: 'POST',
+      body: JSON.stringify(data),
+    });
+  }
+
   async deleteWorkSession(sessionId) {
     return this.request(`/work-sessions/${sessionId}`, {
       method: 'DELETE',
     });
   }
 
+  // DASHBOARD
+  // Riepilogo per appartamento calcolato dal server (filtro opzionale: property_id)
+  async getDashboardSummary(filters = {}) {
+    const params = new URLSearchParams(filters);
+    return this.request(`/dashboard/summary?${params}`);
+  }
+
   // EMAIL SERVICE
   async sendEmail(to, subject, body) {
     return this.request('/email/send', {
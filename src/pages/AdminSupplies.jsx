@@ -74,14 +74,8 @@ export default function AdminSupplies() {
   const apartmentSuppliesQueries = useQuery({
     queryKey: ['all-apartment-supplies'],
     queryFn: async () => {
-      const results = await Promise.all(
-        apartments.map(apt => 
-          apiClient.getApartmentSupplies(apt.id)
-            .then(supplies => ({ apartmentId: apt.id, supplies }))
-            .catch(() => ({ apartmentId: apt.id, supplies: [] }))
-        )
-      );
-      return results;
+      const grouped = await apiClient.getApartmentsSupplies({ apartment_ids: apartments.map(apt => apt.id) });
+      return apartments.map(apt => ({ apartmentId: apt.id, supplies: grouped[apt.id] || [] }));
     },
     enabled: apartments.length > 0,
     initialData: [],
@@ -106,15 +106,9 @@ export default function Apartments() {
   const { data: allApartmentChecklists } = useQuery({
     queryKey: ['all-apartment-checklist-items', apartments.map(a => a.id).join(',')],
     queryFn: async () => {
-      // Fetch apartment checklist items per tutti gli appartamenti con apartment_id
-      const allAssignments = [];
-      for (const apartment of apartments) {
-        const assignments = await apiClient.getApartmentChecklists(apartment.id);
-        // Aggiungi apartment_id a ogni assignment per il conteggio
-        const assignmentsWithApartmentId = assignments.map(a => ({ ...a, apartment_id: apartment.id }));
-        allAssignments.push(...assignmentsWithApartmentId);
-      }
-      return allAssignments;
+      // Fetch apartment checklist items per tutti gli appartamenti in un'unica richiesta
+      const grouped = await apiClient.getApartmentsChecklists(apartments.map(a => a.id));
+      return Object.values(grouped).flat();
     },
     enabled: apartments.length > 0,
     initialData: [],
@@ -124,13 +118,9 @@ export default function Apartments() {
   const { data: allApartmentSuppliesAssignments } = useQuery({
     queryKey: ['all-apartment-supply-items'],
     queryFn: async () => {
-      // Fetch apartment supply items per tutti gli appartamenti
-      const allAssignments = [];
-      for (const apartment of apartments) {
-        const assignments = await apiClient.getApartmentSupplies(apartment.id);
-        allAssignments.push(...assignments);
-      }
-      return allAssignments;
+      // Fetch apartment supply items per tutti gli appartamenti in un'unica richiesta
+      const grouped = await apiClient.getApartmentsSupplies({ apartment_ids: apartments.map(a => a.id) });
+      return Object.values(grouped).flat();
     },
     enabled: apartments.length > 0,
     initialData: [],
@@ -25,16 +25,13 @@ import { createPageUrl } from "@/components/utils";
 
 export default function Dashboard() {
   const { selectedPropertyId } = useProperty();
-  const { data: properties = [], isLoading: loadingProperties } = useQuery({
-    queryKey: ['properties'],
-    queryFn: () => apiClient.getProperties(),
+  // Riepilogo per appartamento (nomi, alert aperti, sessioni attive, ultima pulizia) calcolato dal server
+  const { data: summary, isLoading: loadingSummary } = useQuery({
+    queryKey: ['dashboard-summary', selectedPropertyId],
+    queryFn: () => apiClient.getDashboardSummary(selectedPropertyId ? { property_id: selectedPropertyId } : {}),
   });
 
-  const { data: apartments = [], isLoading: loadingApartments } = useQuery({
-    queryKey: ['apartments', selectedPropertyId],
-    queryFn: () => apiClient.getApartments(selectedPropertyId ? { property_id: selectedPropertyId, active: true } : { active: true }),
-    enabled: !!selectedPropertyId,
-  });
+  const apartments = summary?.apartments || [];
 
   const { data: operators = [] } = useQuery({
     queryKey: ['operators'],
@@ -68,28 +65,19 @@ export default function Dashboard() {
 
   // Recupera tutte le assegnazioni di checklist per calcolare le dotazioni mancanti
   const apartmentChecklistsQueries = useQuery({
-    queryKey: ['all-apartment-checklists'],
+    queryKey: ['all-apartment-checklists', selectedPropertyId],
     queryFn: async () => {
-      const allAssignments = [];
-      for (const apartment of apartments) {
-        const assignments = await apiClient.getApartmentChecklists(apartment.id);
-        allAssignments.push(...assignments.map(a => ({ ...a, apartment_id: apartment.id })));
-      }
-      return allAssignments;
+      const grouped = await apiClient.getApartmentsChecklists(apartments.map(a => a.apartment_id));
+      return Object.values(grouped).flat();
     },
     enabled: apartments.length > 0,
   });
 
   const allApartmentChecklists = apartmentChecklistsQueries.data || [];
 
-  const getPropertyName = (propertyId) => {
-    const property = properties.find(p => p.id === propertyId);
-    return property?.name || 'N/A';
-  };
-
   const getApartmentName = (apartmentId) => {
-    const apartment = apartments.find(a => a.id === apartmentId);
-    return apartment?.name || 'N/A';
+    const apartment = apartments.find(a => a.apartment_id === apartmentId);
+    return apartment?.apartment_name || 'N/A';
   };
 
   const getUserName = (userId) => {
@@ -103,26 +91,10 @@ export default function Dashboard() {
     return supply?.name || 'N/A';
   };
 
-  const getChecklistItemName = (checklistItemId) => {
-    const item = allChecklistItems.find(i => i.id === checklistItemId);
-    return item?.name || 'N/A';
-  };
-
   const getChecklistItemDetails = (checklistItemId) => {
     return allChecklistItems.find(i => i.id === checklistItemId);
   };
 
-  const getLastCleaning = (apartmentId) => {
-    const aptCompletions = completions.filter(c => c.apartment_id === apartmentId);
-    if (aptCompletions.length === 0) return null;
-    
-    return new Date(aptCompletions[0].completed_at);
-  };
-
-  const getApartmentAlerts = (apartmentId) => {
-    return supplyAlerts.filter(a => a.apartment_id === apartmentId).length;
-  };
-
   // Calcola dotazioni mancanti
   const getMissingEquipment = () => {
     const missing = [];
@@ -191,6 +163,29 @@ export default function Dashboard() {
           <p className="text-sm md:text-base text-gray-600">Panoramica generale delle attività</p>
         </div>
 
+        {/* Riepilogo dal server: appartamenti, alert aperti, sessioni in corso */}
+        <div className="grid grid-cols-3 gap-3 md:gap-6 mb-6 md:mb-8">
+          {[
+            { label: 'Appartamenti', value: summary?.total_apartments, icon: Home, color: 'text-blue-600' },
+            { label: 'Alert aperti', value: summary?.open_alerts, icon: AlertTriangle, color: 'text-orange-600' },
+            { label: 'Sessioni in corso', value: summary?.active_sessions, icon: Clock, color: 'text-green-600' },
+          ].map(({ label, value, icon: Icon, color }) => (
+            <Card key={label} className="border-none shadow-lg">
+              <CardContent className="p-3 md:p-6">
+                <div className="flex items-center gap-2 mb-1">
+                  <Icon className={`w-4 h-4 md:w-5 md:h-5 ${color}`} />
+                  <span className="text-xs md:text-sm text-gray-600 truncate">{label}</span>
+                </div>
+                {loadingSummary ? (
+                  <Skeleton className="h-7 w-12" />
+                ) : (
+                  <p className="text-xl md:text-3xl font-bold text-gray-900">{value ?? 0}</p>
+                )}
+              </CardContent>
+            </Card>
+          ))}
+        </div>
+
         {/* PRIMA RIGA: Magazzino in esaurimento + Stato Dotazioni */}
         <div className="grid md:grid-cols-2 gap-4 md:gap-6 mb-6 md:mb-8">
           
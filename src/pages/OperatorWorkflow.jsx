@@ -137,25 +137,17 @@ export default function OperatorWorkflow() {
   });
 
   const toggleCompletionMutation = useMutation({
-    mutationFn: async ({ itemId, completed, item_type, value_bool, value_number }) => {
+    mutationFn: async ({ itemId, completed, item_type, value_bool, value_number, idempotency_key }) => {
       console.log('🔘 Toggle mutation called:', { itemId, completed, userId: user?.id, workSessionId, item_type, value_bool, value_number });
       
-      if (completed) {
-        const completion = completions.find(c => c.checklist_item_id === itemId);
-        if (completion) {
-          console.log('🗑️ Deleting completion:', completion.id);
-          await apiClient.deleteCompletion(completion.id);
-        }
-      } else {
-        console.log('✅ Creating completion...');
-        await apiClient.createCompletion({
-          checklist_item_id: itemId,
-          user_id: user.id,
-          work_session_id: workSessionId,
-          value_bool: value_bool,
-          value_number: value_number
-        });
-      }
+      // La chiave (generata una volta per tocco) evita duplicati se la richiesta viene ripetuta
+      await apiClient.applyCompletionsBatch(workSessionId, [{
+        op: completed ? 'delete' : 'upsert',
+        checklist_item_id: itemId,
+        idempotency_key,
+        value_bool: value_bool,
+        value_number: value_number
+      }]);
     },
     onSuccess: async () => {
       console.log('✅ Toggle mutation SUCCESS');
@@ -169,40 +161,17 @@ export default function OperatorWorkflow() {
     },
   });
 
-  const updateSupplyMutation = useMutation({
-    mutationFn: async ({ apartmentSupplyId, newQuantity }) => {
-      await apiClient.updateApartmentSupply(apartmentSupplyId, { 
-        required_quantity: newQuantity 
-      });
-    },
-    onSuccess: () => {
-      queryClient.invalidateQueries({ queryKey: ['apartment-supplies'] });
-    },
-  });
-
   const completeWorkMutation = useMutation({
     mutationFn: async () => {
-      // Salva gli aggiornamenti delle scorte
-      const updates = Object.entries(supplyUpdates);
-      
-      if (updates.length > 0) {
-        for (const [apartmentSupplyId, newQuantity] of updates) {
-          try {
-            await updateSupplyMutation.mutateAsync({ 
-              apartmentSupplyId: parseInt(apartmentSupplyId), 
-              newQuantity: parseInt(newQuantity) 
-            });
-          } catch (error) {
-            console.error(`Errore aggiornamento scorta ${apartmentSupplyId}:`, error);
-          }
-        }
-      }
-      
-      // Chiudi la work session con end_time e note finali
+      // Chiudi la work session salvando le scorte nella stessa transazione
       if (workSessionId) {
-        await apiClient.updateWorkSession(workSessionId, {
+        await apiClient.closeWorkSession(workSessionId, {
           end_time: new Date().toISOString(),
-          notes: finalNotes || null
+          notes: finalNotes || null,
+          supplies: Object.entries(supplyUpdates).map(([apartmentSupplyId, newQuantity]) => ({
+            apartment_supply_id: parseInt(apartmentSupplyId),
+            required_quantity: parseInt(newQuantity)
+          }))
         });
       }
       
@@ -232,7 +201,10 @@ export default function OperatorWorkflow() {
     console.log('🖱️ handleToggle clicked:', { itemId, isPending: toggleCompletionMutation.isPending, item_type, value_bool, value_number });
     const completed = isCompleted(itemId);
     console.log('🖱️ isCompleted:', completed);
-    toggleCompletionMutation.mutate({ itemId, completed, item_type, value_bool, value_number });
+    toggleCompletionMutation.mutate({
+      itemId, completed, item_type, value_bool, value_number,
+      idempotency_key: crypto.randomUUID()
+    });
   };
   
   const getChecklistValue = (itemId, item_type) => {